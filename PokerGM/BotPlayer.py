@@ -1,4 +1,18 @@
 import random
+import CFRTrainer
+import PolicyTable
+from Equity import estimate_equity
+from PreflopEquity import MAX_OPPONENTS, preflop_equity
+
+DEFAULT_THINK_TIME = 0.2 # Seconds a hard bot spends on equity when the game gives no time budget
+HARD_VALUE_MARGIN = 0.15 # Equity above a fair share (1 / players in the hand) needed to bet for value
+HARD_RAISE_MARGIN = 0.25 # Equity above a fair share needed to raise a bet
+HARD_POSITION_MARGIN = 0.03 # Extra equity wanted per player (up to 2) still to act behind the bot
+HARD_SHORT_STACK_BB = 12 # At or below this many big blinds the bot plays all-in or fold preflop
+HARD_COMMIT_SPR = 2.0 # Stack-to-pot ratio below which a raise goes all in
+HARD_PROTECTION_NPOT = 0.14 # Checked to, a hand ahead now bets to protect itself when it falls behind on this many next cards (NPot)
+HARD_SEMI_BLUFF_PPOT = 0.2 # Checked to, a hand that gets ahead on this many next cards (PPot) may semi-bluff in position
+HAND_ANALYSIS_DIFFICULTIES = ("hard", "cfr") # Bots that read my_hand_potential/my_outs (cfr plays hard when off its tree); the game skips computing them for others
 
 class BotPlayer:
     def __init__(self, name, initial_chips, initial_hearts):
@@ -7,6 +21,7 @@ class BotPlayer:
         self.hearts = initial_hearts
         self.difficulty = "easy" # Default difficulty
         self.cards = [] # Bots might need to know their own cards internally
+        self.think_time = DEFAULT_THINK_TIME # Seconds per decision for the hard bot when the game gives no time budget
 
     def get_action(self, game_state):
         """
@@ -74,19 +89,151 @@ class BotPlayer:
                 else: # Fold
                     return "fold", 0
 
-        # --- Add "Hard" logic here ---
+        # --- "Hard": equity vs pot odds, adjusted for position and stack depth ---
         elif self.difficulty == "hard":
-            # Implement more sophisticated logic using hand strength, pot odds, position etc.
-            # Placeholder: Just calls or folds
-            if amount_to_call > 0:
-                if my_chips >= amount_to_call and random.random() < 0.8: # High chance to call
-                     return "call", 0
-                elif my_chips < amount_to_call and my_chips > 0: # Call all-in if must call
-                     return "all in", 0
-                else:
-                    return "fold", 0
-            else:
-                 return "check", 0 # Just check if possible
+            return self._get_hard_action(game_state, amount_to_call, my_chips, my_bet_this_round)
+
+        # --- "CFR": trained heads-up strategy (see CFRTrainer), hard play where it doesn't apply ---
+        elif self.difficulty == "cfr":
+            return self._get_cfr_action(game_state, amount_to_call, my_chips, my_bet_this_round, CFRTrainer.get_strategy())
+
+        # --- "Policy": the same kind of strategy exported to a memory-mapped table (see PolicyTable), for fast play ---
+        elif self.difficulty == "policy":
+            return self._get_cfr_action(game_state, amount_to_call, my_chips, my_bet_this_round, PolicyTable.get_policy())
 
         else: # Default fallback
-             return "fold", 0
\ No newline at end of file
+             return "fold", 0
+
+    def _get_hard_action(self, game_state, amount_to_call, my_chips, my_bet_this_round):
+        """
+        Hard bot: compares its equity against the players still in with the price of the action.
+         - Equity: precomputed table preflop, anytime estimate within the time budget postflop.
+         - Facing a bet: folds below the pot odds (plus a margin for players still to act behind),
+           raises well above a fair share, calls otherwise.
+         - Checked to: bets for value above a fair share or to protect a vulnerable hand that is ahead now
+           (hand strength and NPot), semi-bluffs big draws in position (outs and PPot).
+         - Stack depth: push/fold preflop when short, raises go all in at a low stack-to-pot ratio.
+        """
+        my_cards = game_state.get('my_cards', [])
+        board = game_state.get('community_cards', [])
+        players = game_state['players']
+        opponents = [name for name, p in players.items() if name != self.name and p['cards'] and not p['folded']]
+        if len(my_cards) != 2 or not opponents: # Nothing to estimate (e.g. Omaha) - play it safe
+            if amount_to_call <= 0: return "check", 0
+            return ("call", 0) if my_chips > amount_to_call else ("fold", 0)
+
+        equity = self._hard_equity(my_cards, board, len(opponents), game_state)
+        fair_share = 1 / (len(opponents) + 1)
+        pot = game_state['pot']
+        big_blind = game_state.get('big_blind', 20)
+        effective_stack = min(my_chips, max(players[name]['chips'] for name in opponents))
+        players_behind = self._players_to_act_after(game_state)
+        position_margin = HARD_POSITION_MARGIN * min(players_behind, 2)
+
+        # Short stack preflop: all in with better than a fair share, otherwise give up the hand
+        if not board and effective_stack <= HARD_SHORT_STACK_BB * big_blind:
+            if equity >= fair_share + position_margin + (0.05 if amount_to_call > 0 else 0.0):
+                return "all in", 0
+            return ("check", 0) if amount_to_call <= 0 else ("fold", 0)
+
+        if amount_to_call > 0:
+            pot_odds = amount_to_call / (pot + amount_to_call)
+            if equity < pot_odds + position_margin:
+                return "fold", 0
+            if amount_to_call >= my_chips:
+                return "all in", 0
+            if equity >= fair_share + HARD_RAISE_MARGIN + position_margin:
+                return self._hard_raise(game_state, amount_to_call, my_chips, my_bet_this_round, effective_stack)
+            return "call", 0
+
+        if equity >= fair_share + HARD_VALUE_MARGIN + position_margin:
+            return self._hard_raise(game_state, amount_to_call, my_chips, my_bet_this_round, effective_stack)
+        potential = game_state.get('my_hand_potential')
+        if potential and potential['hs'] ** len(opponents) >= fair_share and potential['npot'] >= HARD_PROTECTION_NPOT:
+            return self._hard_raise(game_state, amount_to_call, my_chips, my_bet_this_round, effective_stack) # Charge the draws
+        outs = game_state.get('my_outs')
+        drawing = (outs and outs['next_card'] >= 0.25) or (potential and potential['ppot'] >= HARD_SEMI_BLUFF_PPOT)
+        if players_behind == 0 and drawing and random.random() < 0.5: # Semi-bluff a big draw
+            return self._hard_raise(game_state, amount_to_call, my_chips, my_bet_this_round, effective_stack)
+        return "check", 0
+
+    def _hard_equity(self, my_cards, board, num_opponents, game_state):
+        """Equity against num_opponents random hands: table lookup preflop, sampled for most of the time budget after."""
+        if not board:
+            return preflop_equity(my_cards, min(num_opponents, MAX_OPPONENTS))
+        time_budget = game_state.get('time_budget')
+        if time_budget is None: # 0 means the game's budget is already spent - sample as little as possible
+            time_budget = self.think_time
+        return estimate_equity(my_cards, board, num_opponents, time_budget=0.8 * time_budget, target_stderr=0.005)['equity']
+
+    def _players_to_act_after(self, game_state):
+        """Players still able to act who come after the bot in post-flop order (left of the dealer first). 0 = in position."""
+        players = game_state['players']
+        seats = list(players)
+        dealer = game_state.get('dealer_button_player')
+        if dealer in seats:
+            dealer_index = seats.index(dealer)
+            seats = seats[dealer_index + 1:] + seats[:dealer_index + 1]
+        active = [name for name in seats if name == self.name or (players[name]['cards'] and not players[name]['folded'] and not players[name]['all_in'])]
+        return len(active) - 1 - active.index(self.name)
+
+    def _hard_raise(self, game_state, amount_to_call, my_chips, my_bet_this_round, effective_stack):
+        """Bets/raises about three quarters of the pot (at least the minimum raise). Goes all in when that would
+           commit half the stack anyway or the stack is small next to the pot. Returns (action, total bet)."""
+        current_bet = game_state['current_bet']
+        pot = game_state['pot']
+        big_blind = game_state.get('big_blind', 20)
+        min_raise_increment = max(big_blind, current_bet - game_state.get('previous_bet', 0))
+        target_total_bet = current_bet + max(min_raise_increment, int((pot + amount_to_call) * 0.75))
+        chips_needed = target_total_bet - my_bet_this_round
+        if chips_needed >= my_chips * 0.5 or effective_stack < HARD_COMMIT_SPR * (pot + amount_to_call):
+            return "all in", 0
+        return "raise", target_total_bet
+
+    def _get_cfr_action(self, game_state, amount_to_call, my_chips, my_bet_this_round, strategy):
+        """
+        Plays a heads-up strategy (a CFRTrainer.CFRStrategy or PolicyTable.PolicyTable): finds the abstract
+        betting node matching the hand's action history and samples an abstract action for the bot's card
+        bucket. Plays like the hard bot multiway, in Omaha, without a strategy (None), or once the betting
+        has left the abstract game.
+        """
+        spot = self._cfr_spot(game_state, strategy)
+        if spot is None:
+            return self._get_hard_action(game_state, amount_to_call, my_chips, my_bet_this_round)
+        action = strategy.sample(*spot)
+
+        if action == CFRTrainer.FOLD:
+            return ("fold", 0) if amount_to_call > 0 else ("check", 0)
+        if action == CFRTrainer.ALL_IN:
+            return "all in", 0
+        if action == CFRTrainer.RAISE:
+            # Pot-size raise: call, then raise by the pot after the call (at least the minimum raise)
+            current_bet = game_state['current_bet']
+            min_raise_increment = max(game_state.get('big_blind', 20), current_bet - game_state.get('previous_bet', 0))
+            target_total_bet = current_bet + max(min_raise_increment, game_state['pot'] + amount_to_call)
+            if target_total_bet - my_bet_this_round >= my_chips:
+                return "all in", 0
+            return "raise", target_total_bet
+        if amount_to_call <= 0:
+            return "check", 0
+        return ("call", 0) if my_chips > amount_to_call else ("all in", 0)
+
+    def _cfr_spot(self, game_state, strategy):
+        """(decision node, card bucket) of this decision in strategy's abstract game, or None when it doesn't apply."""
+        my_cards = game_state.get('my_cards', [])
+        players = game_state['players']
+        dealt_in = [name for name, p in players.items() if p['cards']]
+        if strategy is None or len(my_cards) != 2 or len(dealt_in) != 2 or self.name not in dealt_in:
+            return None
+        dealer = game_state.get('dealer_button_player')
+        if dealer not in dealt_in:
+            return None
+        opponent = next(name for name in dealt_in if name != self.name)
+        big_blind = game_state.get('big_blind', 20)
+        start_chips = [players[name].get('start_round_chips') or players[name]['chips'] for name in dealt_in]
+        stack_index = strategy.tree.stack_class_index(min(start_chips) / big_blind)
+        seats = {dealer: 0, (opponent if dealer == self.name else self.name): 1}
+        node = strategy.tree.locate(stack_index, game_state.get('action_history', []), seats, big_blind)
+        if node is None or strategy.tree.player[node] != seats[self.name] or CFRTrainer.STREETS[strategy.tree.street[node]] != game_state.get('current_stage'):
+            return None
+        return node, strategy.abstraction.bucket(my_cards, game_state.get('community_cards', []))
@@ -0,0 +1,405 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from CardAbstraction import ABSTRACTIONS
+from Equity import _get_evaluator
+from PreflopEquity import NUM_CLASSES
+try:
+    import numpy as np
+except ImportError: # Training and the strategy tables need NumPy; the CFR bot falls back without it
+    np = None
+
+# Counterfactual regret minimization for heads-up no-limit Hold'em, solved on an abstracted game.
+#  - Betting: fold, check/call, pot-size raise and all in, at most MAX_RAISES_PER_STREET raises a
+#    street. Both players start with the same stack, one of STACK_CLASSES_BB big blinds (a real
+#    hand is played in the class nearest its effective stack). Seat 0 is the button/small blind.
+#  - Cards: the 169 hand classes preflop; after that either the hand strength against a random
+#    hand cut into equal-width buckets ('hs'), or the equity-distribution clusters of the
+#    CardAbstraction bucket files ('buckets', build those first).
+#  - Solver: external-sampling Monte Carlo CFR with CFR+ updates - regrets floored at zero and the
+#    average strategy weighted by iteration. One deal is sampled per iteration; the traverser's
+#    actions are all explored, the opponent's are sampled from the current strategy.
+#  - Tables: regrets and strategy sums are NumPy arrays with a row per information set (betting
+#    node x card bucket) and a column per action. They live as .npy files in the strategy
+#    directory and are memory-mapped, so worker processes update them in place without locks
+#    (an update lost to a race now and then doesn't hurt CFR). The directory is also the
+#    checkpoint: config.json records the iterations done and training resumes from there.
+# Train (NumPy needed, hours for a useful strategy): python CFRTrainer.py --iterations 2000000 [--workers N]
+
+STACK_CLASSES_BB = (10, 30, 100) # Effective stacks (in big blinds) the game is solved for
+MAX_RAISES_PER_STREET = 3
+POSTFLOP_BUCKETS = 20
+CFR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cfr_heads_up")
+CFR_CONFIG_VERSION = 1
+ITERATIONS_PER_TASK = 500 # Iterations per job sent to a worker process
+CHECKPOINT_EVERY = 20000 # Iterations between flushes of the tables and config.json
+
+STREETS = ('pre-flop', 'flop', 'turn', 'river') # Same names as PokerGame.current_stage
+FOLD, CALL, RAISE, ALL_IN = range(4) # CALL is a check when there is nothing to call
+NUM_ACTIONS = 4
+ACTION_NAMES = ('fold', 'call', 'raise', 'all in')
+DECISION, FOLD_END, SHOWDOWN_END = range(3) # Node kinds
+
+_CONFIG_FILE = "config.json"
+_REGRETS_FILE = "regrets.npy"
+_STRATEGY_FILE = "strategy_sum.npy"
+_SMALL_BLIND, _BIG_BLIND = 0.5, 1.0
+
+_SOLVER = None # Per-process solver holding the memory-mapped tables (workers open their own)
+_STRATEGIES = {} # Directory -> CFRStrategy (or None if nothing trained there), for the bots
+
+
+# --- Betting abstraction ---
+
+class BettingTree:
+    """
+    Every betting sequence of the abstract game, one tree per stack class, as flat lists indexed by
+    node id. Decision nodes own buckets_per_street[street] consecutive rows of the tables starting at
+    offset[node]; terminal nodes store value[node], the chips seat 0 wins (x the showdown result
+    for showdowns). Chip amounts are in big blinds.
+    """
+
+    def __init__(self, stack_classes=STACK_CLASSES_BB, max_raises=MAX_RAISES_PER_STREET, postflop_buckets=POSTFLOP_BUCKETS):
+        self.stack_classes = tuple(stack_classes)
+        self.max_raises = max_raises
+        self.buckets_per_street = (NUM_CLASSES,) + (postflop_buckets,) * 3
+        self.kind, self.player, self.street, self.children, self.actions, self.offset, self.value = [], [], [], [], [], [], []
+        self.num_infosets = 0
+        self.roots = [self._build(stack, 0, 0, (_SMALL_BLIND, _BIG_BLIND), (0.0, 0.0), 0, (False, False)) for stack in self.stack_classes]
+
+    def _new_node(self, kind, player, street, value=0.0):
+        self.kind.append(kind); self.player.append(player); self.street.append(street)
+        self.children.append([-1] * NUM_ACTIONS); self.actions.append([]); self.offset.append(-1); self.value.append(value)
+        return len(self.kind) - 1
+
+    def _build(self, stack, street, player, bets, invested, raises, acted):
+        """Decision node for player with bets this street and chips invested on earlier streets."""
+        node = self._new_node(DECISION, player, street)
+        self.offset[node] = self.num_infosets
+        self.num_infosets += self.buckets_per_street[street]
+        other = 1 - player
+        to_call = bets[other] - bets[player]
+        remaining = stack - invested[player] - bets[player]
+        children = self.children[node]
+
+        if to_call > 0:
+            # The folder loses what they have put in (value is seat 0's gain)
+            lost = invested[player] + bets[player]
+            children[FOLD] = self._new_node(FOLD_END, player, street, -lost if player == 0 else lost)
+
+        called = tuple(bets[seat] + (to_call if seat == player else 0) for seat in (0, 1))
+        now_acted = tuple(acted[seat] or seat == player for seat in (0, 1))
+        if all(now_acted):
+            # Street over: showdown after the river or once someone is all in, otherwise the next street (big blind first)
+            total = tuple(invested[seat] + called[seat] for seat in (0, 1))
+            if street == 3 or total[0] >= stack:
+                children[CALL] = self._new_node(SHOWDOWN_END, player, street, total[0])
+            else:
+                children[CALL] = self._build(stack, street + 1, 1, (0.0, 0.0), total, 0, (False, False))
+        else:
+            children[CALL] = self._build(stack, street, other, called, invested, raises, now_acted)
+
+        if raises < self.max_raises and remaining > to_call and stack - invested[other] - bets[other] > 0:
+            pot = sum(invested) + sum(bets)
+            raise_to = bets[other] + pot + to_call # Pot-size raise: call, then raise the size of the pot
+            if raise_to - bets[player] < remaining:
+                raised = tuple(raise_to if seat == player else bets[seat] for seat in (0, 1))
+                children[RAISE] = self._build(stack, street, other, raised, invested, raises + 1, now_acted)
+            shoved = tuple(bets[seat] + (remaining if seat == player else 0) for seat in (0, 1))
+            children[ALL_IN] = self._build(stack, street, other, shoved, invested, raises + 1, now_acted)
+        self.actions[node] = [action for action in range(NUM_ACTIONS) if children[action] >= 0]
+        return node
+
+    def stack_class_index(self, stack_bb):
+        """Index of the stack class nearest (by ratio) an effective stack in big blinds."""
+        return min(range(len(self.stack_classes)), key=lambda i: abs(math.log(max(stack_bb, 1e-9) / self.stack_classes[i])))
+
+    def locate(self, stack_index, action_history, seats, big_blind):
+        """
+        Decision node reached by a real hand's action history (PokerGame.action_history entries:
+        {'stage', 'player', 'action', 'bet'}) in the tree of a stack class. seats maps player names to
+        0 (button/small blind) or 1. Bets and raises map to the nearest abstract action by kind, not size:
+        a raise is the pot-size raise (all in if that isn't in the tree) and an all-in bet or raise is
+        the all-in action. A call that puts the player all in is still the call. Returns None if the
+        history leaves the abstract game.
+        """
+        node = self.roots[stack_index]
+        street_bets = {STREETS[0]: big_blind}
+        for entry in action_history:
+            if self.kind[node] != DECISION or STREETS[self.street[node]] != entry['stage'] or seats.get(entry['player']) != self.player[node]:
+                return None
+            children = self.children[node]
+            if entry['action'] == 'fold':
+                preferred = (FOLD,)
+            elif entry['bet'] > street_bets.get(entry['stage'], 0):
+                preferred = (ALL_IN, RAISE, CALL) if entry['action'] == 'all in' else (RAISE, ALL_IN, CALL)
+                street_bets[entry['stage']] = entry['bet']
+            else:
+                preferred = (CALL,)
+            child = next((children[action] for action in preferred if children[action] >= 0), -1)
+            if child < 0:
+                return None
+            node = child
+        return node if self.kind[node] == DECISION else None
+
+
+# --- Card abstraction (see CardAbstraction) ---
+
+def _make_abstraction(config):
+    return ABSTRACTIONS[config['abstraction']](config['postflop_buckets'])
+
+
+def _make_tree(config):
+    return BettingTree(config['stack_classes'], config['max_raises'], config['postflop_buckets'])
+
+
+# --- Solver ---
+
+def _read_config(directory):
+    with open(os.path.join(directory, _CONFIG_FILE)) as f:
+        config = json.load(f)
+    if config.get('version') != CFR_CONFIG_VERSION:
+        raise ValueError(f"{directory} holds a version {config.get('version')} strategy, expected {CFR_CONFIG_VERSION} - retrain it")
+    return config
+
+
+def _write_config(directory, config):
+    path = os.path.join(directory, _CONFIG_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(config, f, indent=1)
+    os.replace(path + ".tmp", path) # A crash mid-write leaves the previous checkpoint intact
+
+
+class _Solver:
+    """The tree, card abstraction and memory-mapped tables of one strategy directory."""
+
+    def __init__(self, directory):
+        self.config = _read_config(directory)
+        self.tree = _make_tree(self.config)
+        self.abstraction = _make_abstraction(self.config)
+        self.regrets_map = np.load(os.path.join(directory, _REGRETS_FILE), mmap_mode='r+')
+        self.strategy_map = np.load(os.path.join(directory, _STRATEGY_FILE), mmap_mode='r+')
+        # Plain ndarray views of the maps index faster than np.memmap
+        self.regrets = self.regrets_map.view(np.ndarray)
+        self.strategy_sum = self.strategy_map.view(np.ndarray)
+
+    def flush(self):
+        self.regrets_map.flush()
+        self.strategy_map.flush()
+
+    def run(self, first_iteration, num_iterations, seed):
+        """num_iterations iterations numbered from first_iteration (+1 is the averaging weight of the first)."""
+        rng = random.Random(seed)
+        tree = self.tree
+        for iteration in range(first_iteration, first_iteration + num_iterations):
+            cards = rng.sample(range(52), 9)
+            holes = (cards[0:2], cards[2:4])
+            board = cards[4:]
+            buckets = self.abstraction.deal_buckets(holes, board)
+            score_0, score_1 = _get_evaluator().evaluate_batch(np.array([holes[0] + board, holes[1] + board], dtype=np.int64)).tolist()
+            showdown = (score_0 > score_1) - (score_0 < score_1) # +1 when seat 0 wins
+            root = tree.roots[rng.randrange(len(tree.roots))]
+            for traverser in (0, 1):
+                self._traverse(root, traverser, buckets, showdown, iteration + 1, rng)
+        return num_iterations
+
+    def _traverse(self, node, traverser, buckets, showdown, weight, rng):
+        """Sampled counterfactual value of node for the traverser, updating regrets and strategy sums on the way."""
+        tree = self.tree
+        kind = tree.kind[node]
+        if kind != DECISION:
+            value = tree.value[node] if kind == FOLD_END else tree.value[node] * showdown
+            return value if traverser == 0 else -value
+        player = tree.player[node]
+        infoset = tree.offset[node] + buckets[player][tree.street[node]]
+        actions = tree.actions[node]
+        children = tree.children[node]
+        regrets = self.regrets[infoset]
+        strategy = _regret_matching(regrets, actions)
+
+        if player == traverser:
+            values = [self._traverse(children[action], traverser, buckets, showdown, weight, rng) for action in actions]
+            node_value = sum(p * v for p, v in zip(strategy, values))
+            for action, value in zip(actions, values):
+                regrets[action] = max(0.0, regrets[action] + value - node_value) # CFR+: regrets never go below zero
+            return node_value
+
+        strategy_sum = self.strategy_sum[infoset]
+        for action, p in zip(actions, strategy):
+            strategy_sum[action] += weight * p
+        pick = rng.random()
+        for action, p in zip(actions, strategy):
+            pick -= p
+            if pick < 0:
+                break
+        return self._traverse(children[action], traverser, buckets, showdown, weight, rng)
+
+
+def _regret_matching(regrets, actions):
+    """Action probabilities proportional to positive regret (uniform over legal actions when none is positive)."""
+    positive = [max(0.0, float(regrets[action])) for action in actions]
+    total = sum(positive)
+    if total <= 0:
+        return [1.0 / len(actions)] * len(actions)
+    return [r / total for r in positive]
+
+
+def _init_worker(directory):
+    global _SOLVER
+    _SOLVER = _Solver(directory)
+
+
+def _run_task(first_iteration, num_iterations, seed):
+    return _SOLVER.run(first_iteration, num_iterations, seed)
+
+
+def _create(directory, stack_classes, max_raises, postflop_buckets, abstraction):
+    if abstraction not in ABSTRACTIONS:
+        raise ValueError(f"Unknown card abstraction '{abstraction}'. Choose from: {', '.join(ABSTRACTIONS)}")
+    if max_raises < 1 or postflop_buckets < 1 or not stack_classes or min(stack_classes) <= _BIG_BLIND:
+        raise ValueError("Need at least one raise per street, one postflop bucket and stacks above the big blind")
+    config = {'version': CFR_CONFIG_VERSION, 'stack_classes': list(stack_classes), 'max_raises': max_raises,
+              'postflop_buckets': postflop_buckets, 'abstraction': abstraction, 'iterations': 0, 'seconds': 0.0}
+    tree = _make_tree(config)
+    os.makedirs(directory, exist_ok=True)
+    for name in (_REGRETS_FILE, _STRATEGY_FILE):
+        table = np.lib.format.open_memmap(os.path.join(directory, name), mode='w+', dtype=np.float64, shape=(tree.num_infosets, NUM_ACTIONS))
+        table.flush()
+        del table
+    _write_config(directory, config)
+    print(f"Created {directory}: {len(tree.kind):,} betting nodes, {tree.num_infosets:,} information sets")
+    return config
+
+
+def train(directory=CFR_DIR, iterations=100000, workers=None, seed=None, checkpoint_every=CHECKPOINT_EVERY,
+          stack_classes=STACK_CLASSES_BB, max_raises=MAX_RAISES_PER_STREET, postflop_buckets=POSTFLOP_BUCKETS, abstraction='hs'):
+    """
+    Runs iterations more CFR iterations on the strategy in directory, creating it (with the given
+    abstraction) on first use and resuming it otherwise - a resumed run keeps its stored abstraction.
+    Jobs are spread over workers processes (default: every core) sharing the memory-mapped tables.
+    Checkpoints every checkpoint_every iterations and when interrupted (Ctrl-C). Returns the config.
+    """
+    if np is None:
+        raise ImportError("NumPy is required to train CFR strategies.")
+    if os.path.exists(os.path.join(directory, _CONFIG_FILE)):
+        config = _read_config(directory)
+        print(f"Resuming {directory} at iteration {config['iterations']:,}")
+    else:
+        config = _create(directory, stack_classes, max_raises, postflop_buckets, abstraction)
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    tables = _Solver(directory) # The main process's maps, flushed at checkpoints
+    done = next_iteration = config['iterations']
+    target = done + iterations
+    last_checkpoint = done
+    start = time.perf_counter()
+
+    def checkpoint():
+        tables.flush()
+        config['iterations'] = done
+        config['seconds'] = config['seconds'] + time.perf_counter() - start
+        _write_config(directory, config)
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(directory,)) if workers > 1 else None
+    pending = set()
+    try:
+        while done < target:
+            while next_iteration < target and len(pending) < 2 * workers:
+                count = min(ITERATIONS_PER_TASK, target - next_iteration)
+                if pool is None:
+                    done += tables.run(next_iteration, count, rng.getrandbits(64))
+                else:
+                    pending.add(pool.submit(_run_task, next_iteration, count, rng.getrandbits(64)))
+                next_iteration += count
+                if pool is None:
+                    break
+            if pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                done += sum(future.result() for future in finished)
+            if done - last_checkpoint >= checkpoint_every:
+                checkpoint()
+                start, last_checkpoint = time.perf_counter(), done
+                print(f"  {done:,} iterations, {config['seconds']:.0f}s")
+    except KeyboardInterrupt:
+        print("Interrupted - saving a checkpoint")
+        for future in pending:
+            future.cancel()
+        # Jobs already running can't be cancelled: they finish and write to the tables, so count them
+        finished, _ = wait(pending)
+        done += sum(future.result() for future in finished if not future.cancelled() and future.exception() is None)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+        checkpoint()
+    return config
+
+
+# --- Playing ---
+
+class CFRStrategy:
+    """Average strategy of a trained directory (read-only memory map) with its tree and card abstraction."""
+
+    def __init__(self, directory=CFR_DIR):
+        if np is None:
+            raise ImportError("NumPy is required to load CFR strategies.")
+        self.config = _read_config(directory)
+        self.tree = _make_tree(self.config)
+        self.abstraction = _make_abstraction(self.config)
+        self.strategy_sum = np.load(os.path.join(directory, _STRATEGY_FILE), mmap_mode='r')
+        if self.strategy_sum.shape != (self.tree.num_infosets, NUM_ACTIONS):
+            raise ValueError(f"{directory} doesn't match its config - retrain it")
+
+    def probabilities(self, node, bucket):
+        """{action: probability} of the average strategy at a decision node for a card bucket."""
+        actions = self.tree.actions[node]
+        sums = self.strategy_sum[self.tree.offset[node] + bucket]
+        total = sum(float(sums[action]) for action in actions)
+        if total <= 0: # Never reached in training
+            return {action: 1.0 / len(actions) for action in actions}
+        return {action: float(sums[action]) / total for action in actions}
+
+    def sample(self, node, bucket, rng=random):
+        """An action drawn from the average strategy at a decision node for a card bucket."""
+        pick = rng.random()
+        for action, probability in self.probabilities(node, bucket).items():
+            pick -= probability
+            if pick < 0:
+                return action
+        return action
+
+
+def get_strategy(directory=CFR_DIR):
+    """CFRStrategy for directory, loaded once per process; None if nothing has been trained there (or no NumPy)."""
+    if directory not in _STRATEGIES:
+        try:
+            _STRATEGIES[directory] = CFRStrategy(directory)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"DEBUG CFR: No CFR strategy available in {directory} ({e})")
+            _STRATEGIES[directory] = None
+    return _STRATEGIES[directory]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a heads-up CFR strategy (creates or resumes a strategy directory).")
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: every core)")
+    parser.add_argument('--output', default=CFR_DIR, help="Strategy directory")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY)
+    parser.add_argument('--stacks', default=','.join(map(str, STACK_CLASSES_BB)), help="Stack classes in big blinds (new directories only)")
+    parser.add_argument('--max-raises', type=int, default=MAX_RAISES_PER_STREET, help="Raises per street (new directories only)")
+    parser.add_argument('--buckets', type=int, default=POSTFLOP_BUCKETS, help="Postflop card buckets (new directories only)")
+    parser.add_argument('--abstraction', choices=sorted(ABSTRACTIONS), default='hs', help="Card abstraction (new directories only)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    config = train(args.output, args.iterations, args.workers, args.seed, args.checkpoint_every,
+                   [int(s) for s in args.stacks.split(',')], args.max_raises, args.buckets, args.abstraction)
+    print(f"{args.output}: {config['iterations']:,} iterations in total, this run took {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from CardEncoding import CARD_BIT, CARD_RANK_BIT, card_from_str
+from HandRange import COMBOS, COMBO_INDEX
+from PreflopEquity import hand_class
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed to build the bucket files and for hand strength batches, not for lookups
+    np = None
+
+# Card abstraction: hands grouped into buckets per street, for solvers (CFRTrainer) and table bots.
+#  - Preflop the bucket is the hand class (169, lossless).
+#  - Flop, turn and river buckets come from bucket files built offline for every canonical board
+#    (boards equal up to a relabeling of suits: 1,755 flops, 16,432 turns, 134,459 rivers) and
+#    every two-card hand on it. Each hand gets an equity-distribution feature: its hand strength
+#    against a random hand on the river (HS, as in HandPotential), for every way the board can
+#    run out, as a histogram - kept as a cumulative histogram, so that squared distance between
+#    features follows how far equity has to move (earth mover's distance) and draws don't land
+#    with made hands of the same average. On the river the feature is HS itself. Features are
+#    clustered with k-means and buckets are numbered by their EHS^2 (mean squared final HS), so
+#    bucket 0 is the weakest.
+#  - A bucket file holds the canonical boards' codes and a (boards x 1326 combos) uint8 table.
+#    A lookup relabels suits into the canonical order, finds the board in a dict and reads one
+#    byte of the memory-mapped table: O(1), no NumPy needed.
+# Build (NumPy needed; the flop and turn passes take a while, spread over every core):
+#   python CardAbstraction.py [--streets flop,turn,river] [--buckets 50] [--workers N]
+
+DEFAULT_BUCKETS = 50
+MAX_BUCKETS = 255 # Bucket 255 marks hands that share a card with the board
+HISTOGRAM_BINS = 10 # Final HS histogram bins of the flop and turn features
+KMEANS_ITERATIONS = 50
+KMEANS_SAMPLE = 200000 # Hands the centers are fitted on (weighted by how many real boards they stand for)
+FEATURE_BATCH = 64 # Boards scored per vectorized hand strength step
+BOARDS_PER_TASK = 8 # Canonical boards per job sent to a worker process
+BOARD_SIZES = (0, 3, 4, 5) # Board cards per street, preflop first
+STREET_NAMES = {3: 'flop', 4: 'turn', 5: 'river'}
+NUM_COMBOS = len(COMBOS)
+BUCKET_FILE_VERSION = 1
+BUCKET_FILES = {size: os.path.join(os.path.dirname(os.path.abspath(__file__)), f"card_buckets_{name}_v{BUCKET_FILE_VERSION}.bin")
+                for size, name in STREET_NAMES.items()}
+_BUCKET_MAGIC = b"PGCB"
+_BUCKET_HEADER = struct.Struct("<4sIIII") # magic, version, board size, buckets, canonical boards
+_DEAD_BUCKET = 255
+
+_COMBO_ARRAY = None
+_COMBO_BITS = None
+_BUCKET_TABLES = {} # Board size -> _BucketTable, loaded on first lookup
+
+
+# --- Canonical boards ---
+
+def board_code(board):
+    """(code, suit relabeling) of a board: the code is equal for boards that differ only by suits
+       (the four per-suit rank masks, largest first, 13 bits each); relabel[suit] is that suit's
+       position in the order, which maps the board onto canonical_board(code)."""
+    masks = [0, 0, 0, 0]
+    for card in board:
+        masks[card & 3] |= CARD_RANK_BIT[card]
+    order = sorted(range(4), key=lambda suit: -masks[suit]) # Suits with equal masks are interchangeable
+    relabel = [0] * 4
+    for position, suit in enumerate(order):
+        relabel[suit] = position
+    return masks[order[0]] << 39 | masks[order[1]] << 26 | masks[order[2]] << 13 | masks[order[3]], relabel
+
+
+def canonical_board(code):
+    """The board a code stands for, with suits in canonical order."""
+    return [rank * 4 + suit for suit in range(4) for rank in range(13) if code >> (39 - 13 * suit) >> rank & 1]
+
+
+def canonical_boards(board_size):
+    """{code: number of real boards with that code} for every board of board_size cards, in code order."""
+    counts = Counter(board_code(board)[0] for board in combinations(range(52), board_size))
+    return dict(sorted(counts.items()))
+
+
+# --- Hand strength of every combo ---
+
+def _combo_array():
+    global _COMBO_ARRAY, _COMBO_BITS
+    if _COMBO_ARRAY is None:
+        _COMBO_ARRAY = np.array(COMBOS, dtype=np.int64)
+        _COMBO_BITS = np.array([CARD_BIT[high] | CARD_BIT[low] for high, low in COMBOS], dtype=np.uint64)
+    return _COMBO_ARRAY
+
+
+def hand_strengths_batch(boards):
+    """
+    Hand strength (share of the opponent's possible hands beaten, ties counting half) of every
+    two-card combo on each of a (k, n) array of boards with 3-5 cards. Returns a (k, 1326) float
+    array indexed like HandRange.COMBOS, NaN for combos that use a board card - the same numbers
+    as HandPotential's 'hs', for all hands of all boards in one batch evaluation.
+    """
+    from Equity import _get_evaluator # Shared per-process batch evaluator
+    combos = _combo_array()
+    boards = np.asarray(boards, dtype=np.int64)
+    num_boards, board_size = boards.shape
+    board_bits = np.bitwise_or.reduce(np.left_shift(np.uint64(1), boards.astype(np.uint64)), axis=1)
+    live = (_COMBO_BITS[None, :] & board_bits[:, None]) == 0
+    live_index = np.nonzero(live)[1].reshape(num_boards, -1) # The same number of live combos on every board
+    num_live = live_index.shape[1]
+    hands = combos[live_index]
+    cards = np.concatenate([hands, np.broadcast_to(boards[:, None, :], (num_boards, num_live, board_size))], axis=2)
+    scores = _get_evaluator().evaluate_batch(cards.reshape(-1, board_size + 2)).reshape(num_boards, num_live)
+
+    # Hands below / tied with each hand: where its score's run starts and ends in score order
+    order = np.argsort(scores, axis=1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=1)
+    positions = np.broadcast_to(np.arange(num_live), (num_boards, num_live))
+    new_run = np.ones((num_boards, num_live), dtype=bool)
+    new_run[:, 1:] = sorted_scores[:, 1:] != sorted_scores[:, :-1]
+    run_end = np.ones((num_boards, num_live), dtype=bool)
+    run_end[:, :-1] = new_run[:, 1:]
+    run_start = np.maximum.accumulate(np.where(new_run, positions, 0), axis=1)
+    run_stop = np.minimum.accumulate(np.where(run_end, positions + 1, num_live)[:, ::-1], axis=1)[:, ::-1]
+    lower, upper = np.empty_like(run_start), np.empty_like(run_stop)
+    np.put_along_axis(lower, order, run_start, axis=1)
+    np.put_along_axis(upper, order, run_stop, axis=1)
+
+    # Take out opponent hands sharing a card with ours: running counts of each card's hands in score order
+    rows = np.arange(num_boards)[:, None]
+    sorted_hands = np.take_along_axis(hands, order[:, :, None], axis=1)
+    below = np.zeros((num_boards, num_live + 1, 52), dtype=np.int32)
+    below[rows, positions + 1, sorted_hands[:, :, 0]] = 1
+    below[rows, positions + 1, sorted_hands[:, :, 1]] = 1
+    np.cumsum(below, axis=1, out=below)
+    first, second = hands[:, :, 0], hands[:, :, 1]
+    beaten = lower - below[rows, lower, first] - below[rows, lower, second]
+    tied = (upper - lower) - (below[rows, upper, first] - below[rows, lower, first]) - (below[rows, upper, second] - below[rows, lower, second]) + 1
+    opponents = num_live - 2 * (51 - board_size) + 1 # Hands sharing neither card
+    strengths = np.full((num_boards, NUM_COMBOS), np.nan)
+    strengths[rows, live_index] = (beaten + tied / 2) / opponents
+    return strengths
+
+
+def board_hand_strengths(board):
+    """hand_strengths_batch for a single 3-5 card board: a (1326,) array."""
+    return hand_strengths_batch([list(board)])[0]
+
+
+# --- Features ---
+
+def _street_features(board_size, codes):
+    """Features of every combo on the canonical boards of codes: (len(codes), 1326, dims) float32, NaN for dead combos."""
+    if board_size == 5:
+        boards = [canonical_board(code) for code in codes]
+        return np.concatenate([hand_strengths_batch(boards[start:start + FEATURE_BATCH])
+                               for start in range(0, len(boards), FEATURE_BATCH)])[:, :, None].astype(np.float32)
+    features = np.empty((len(codes), NUM_COMBOS, HISTOGRAM_BINS - 1), dtype=np.float32)
+    for i, code in enumerate(codes):
+        board = canonical_board(code)
+        unseen = [card for card in range(52) if card not in board]
+        runouts = [board + list(extra) for extra in combinations(unseen, 5 - board_size)]
+        counts = np.zeros((NUM_COMBOS, HISTOGRAM_BINS), dtype=np.int64)
+        for start in range(0, len(runouts), FEATURE_BATCH):
+            strengths = hand_strengths_batch(runouts[start:start + FEATURE_BATCH])
+            live = ~np.isnan(strengths)
+            bins = np.minimum(HISTOGRAM_BINS - 1, (np.where(live, strengths, 0) * HISTOGRAM_BINS).astype(np.int64))
+            counts += np.stack([np.count_nonzero(live & (bins == b), axis=0) for b in range(HISTOGRAM_BINS)], axis=1)
+        totals = counts.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            features[i] = (np.cumsum(counts, axis=1) / totals)[:, :-1] # The last cumulative bin is always 1
+    return features
+
+
+def _feature_chunks(board_size, chunks, workers):
+    """Yields (first row, features) for each (first row, codes) chunk, in worker processes when workers > 1."""
+    if workers <= 1:
+        for first, codes in chunks:
+            yield first, _street_features(board_size, codes)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_street_features, board_size, codes): first for first, codes in chunks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _center_ehs2(centers, board_size):
+    """EHS^2 of cluster centers: mean squared final HS, from bin midpoints for histogram features."""
+    if board_size == 5:
+        return centers[:, 0] ** 2
+    cumulative = np.concatenate([centers, np.ones((len(centers), 1))], axis=1)
+    shares = np.diff(cumulative, axis=1, prepend=0)
+    midpoints = (np.arange(HISTOGRAM_BINS) + 0.5) / HISTOGRAM_BINS
+    return shares @ midpoints ** 2
+
+
+# --- k-means ---
+
+def assign_clusters(points, centers, chunk=1 << 16):
+    """Index of the nearest center (squared distance) for each of an (n, dims) array of points."""
+    labels = np.empty(len(points), dtype=np.int64)
+    center_norms = (centers ** 2).sum(axis=1)
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        labels[start:start + chunk] = np.argmin(center_norms[None, :] - 2 * block @ centers.T, axis=1)
+    return labels
+
+
+def kmeans(points, k, iterations=KMEANS_ITERATIONS, rng=None):
+    """k-means++ seeding, then Lloyd iterations until assignments settle. Returns the (k, dims) centers."""
+    rng = rng or np.random.default_rng()
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < k:
+        raise ValueError(f"Need at least {k} points to make {k} clusters, got {len(points)}")
+    centers = [points[rng.integers(len(points))]]
+    nearest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        # Next center drawn with probability proportional to squared distance (any point if all coincide)
+        total = nearest.sum()
+        index = rng.choice(len(points), p=nearest / total) if total > 0 else rng.integers(len(points))
+        centers.append(points[index])
+        nearest = np.minimum(nearest, ((points - points[index]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iterations):
+        new_labels = assign_clusters(points, centers)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sizes = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        filled = sizes > 0
+        centers[filled] = sums[filled] / sizes[filled, None]
+        if not filled.all(): # Restart empty clusters on the points furthest from their centers
+            distances = ((points - centers[labels]) ** 2).sum(axis=1)
+            centers[~filled] = points[np.argsort(distances)[-np.count_nonzero(~filled):]]
+    return centers
+
+
+# --- Building the files (offline, NumPy) ---
+
+def build_bucket_file(board_size, buckets=DEFAULT_BUCKETS, path=None, workers=None, seed=12345):
+    """Computes the features of every hand on every canonical board of board_size (3-5) cards,
+       clusters them into buckets and writes the bucket file (default: BUCKET_FILES[board_size])."""
+    if np is None:
+        raise ImportError("NumPy is required to build the bucket files.")
+    if board_size not in STREET_NAMES or not 1 <= buckets <= MAX_BUCKETS:
+        raise ValueError(f"Need a 3-5 card board and 1..{MAX_BUCKETS} buckets, got {board_size} and {buckets}")
+    path = path or BUCKET_FILES[board_size]
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    street = STREET_NAMES[board_size]
+    start = time.perf_counter()
+    boards = canonical_boards(board_size)
+    codes = list(boards)
+    weights = np.array([boards[code] for code in codes], dtype=np.float64)
+    dims = 1 if board_size == 5 else HISTOGRAM_BINS - 1
+    print(f"  {street}: {len(codes):,} canonical boards")
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as scratch:
+        # Features go to a memory-mapped scratch file (the turn's are several hundred MB)
+        features = np.lib.format.open_memmap(os.path.join(scratch, "features.npy"), mode='w+', dtype=np.float16,
+                                             shape=(len(codes), NUM_COMBOS, dims))
+        per_task = BOARDS_PER_TASK if board_size < 5 else 4 * FEATURE_BATCH # River boards are quick
+        chunks = [(first, codes[first:first + per_task]) for first in range(0, len(codes), per_task)]
+        for done, (first, result) in enumerate(_feature_chunks(board_size, chunks, workers), 1):
+            features[first:first + len(result)] = result
+            if done % 100 == 0:
+                print(f"  {street}: features for {done * per_task:,}/{len(codes):,} boards, {time.perf_counter() - start:.0f}s")
+
+        # Fit on a sample of live hands, boards drawn by how many real boards they stand for
+        sample_boards = rng.choice(len(codes), size=KMEANS_SAMPLE, p=weights / weights.sum())
+        sample_combos = rng.integers(NUM_COMBOS, size=KMEANS_SAMPLE)
+        sample = features[sample_boards, sample_combos].astype(np.float64)
+        sample = sample[~np.isnan(sample).any(axis=1)]
+        centers = kmeans(sample, buckets, rng=rng)
+        rank = np.empty(buckets, dtype=np.int64)
+        rank[np.argsort(_center_ehs2(centers, board_size), kind='stable')] = np.arange(buckets) # Bucket 0 = lowest EHS^2
+        print(f"  {street}: {buckets} clusters fitted, {time.perf_counter() - start:.0f}s")
+
+        table = np.full((len(codes), NUM_COMBOS), _DEAD_BUCKET, dtype=np.uint8)
+        for first in range(0, len(codes), 256):
+            block = features[first:first + 256].astype(np.float64).reshape(-1, dims)
+            live = ~np.isnan(block).any(axis=1)
+            labels = np.full(len(block), _DEAD_BUCKET, dtype=np.uint8)
+            labels[live] = rank[assign_clusters(block[live], centers)]
+            table[first:first + 256] = labels.reshape(-1, NUM_COMBOS)
+        del features
+
+    with open(path, "wb") as f:
+        f.write(_BUCKET_HEADER.pack(_BUCKET_MAGIC, BUCKET_FILE_VERSION, board_size, buckets, len(codes)))
+        f.write(np.array(codes, dtype='<i8').tobytes())
+        f.write(table.tobytes())
+    print(f"  {street}: wrote {path} in {time.perf_counter() - start:.0f}s")
+
+
+# --- Lookups ---
+
+class _BucketTable:
+    """One street's bucket file: canonical board code -> row, and the memory-mapped (boards x 1326) table."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _BUCKET_HEADER.size:
+            raise ValueError(f"{path} is truncated - rebuild it with CardAbstraction.py")
+        magic, version, self.board_size, self.buckets, num_boards = _BUCKET_HEADER.unpack_from(self._map)
+        if magic != _BUCKET_MAGIC or version != BUCKET_FILE_VERSION:
+            raise ValueError(f"{path} is not a version {BUCKET_FILE_VERSION} bucket file - rebuild it with CardAbstraction.py")
+        self._table_start = _BUCKET_HEADER.size + 8 * num_boards
+        if len(self._map) != self._table_start + num_boards * NUM_COMBOS:
+            raise ValueError(f"{path} is truncated - rebuild it with CardAbstraction.py")
+        codes = array('q')
+        codes.frombytes(self._map[_BUCKET_HEADER.size:self._table_start])
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        self._rows = {code: row for row, code in enumerate(codes)}
+
+    def bucket(self, hole_cards, board):
+        code, relabel = board_code(board)
+        first, second = (card & ~3 | relabel[card & 3] for card in hole_cards)
+        combo = COMBO_INDEX[(first, second) if first > second else (second, first)]
+        return self._map[self._table_start + self._rows[code] * NUM_COMBOS + combo]
+
+
+def _get_bucket_table(board_size):
+    if board_size not in _BUCKET_TABLES:
+        _BUCKET_TABLES[board_size] = _BucketTable(BUCKET_FILES[board_size])
+    return _BUCKET_TABLES[board_size]
+
+
+def bucket_counts():
+    """Buckets per street [preflop, flop, turn, river] of the bucket files. Raises OSError/ValueError if one is missing or bad."""
+    return [169] + [_get_bucket_table(size).buckets for size in BOARD_SIZES[1:]]
+
+
+def card_bucket(hole_cards, board=()):
+    """
+    Bucket of two hole cards on the board so far (card ints or 'Ah'-style strings): the hand class
+    preflop, a lookup in the street's bucket file after. Raises OSError if the file hasn't been built.
+    """
+    hole_cards = [card_from_str(c) if isinstance(c, str) else c for c in hole_cards]
+    board = [card_from_str(c) if isinstance(c, str) else c for c in board]
+    if len(hole_cards) != 2 or len(board) not in BOARD_SIZES or len(set(hole_cards + board)) != len(hole_cards + board):
+        raise ValueError(f"Need 2 hole cards and a 0 or 3-5 card board with no duplicates, got {len(hole_cards)} and {len(board)}")
+    if not board:
+        return hand_class(hole_cards)
+    return _get_bucket_table(len(board)).bucket(hole_cards, board)
+
+
+# --- Abstractions for CFRTrainer ---
+
+class HandStrengthAbstraction:
+    """Bucket = hand class preflop, hand strength cut into postflop_buckets equal-width buckets after."""
+    name = 'hs'
+
+    def __init__(self, postflop_buckets):
+        self.postflop_buckets = postflop_buckets
+
+    def _strength_bucket(self, strength):
+        return min(self.postflop_buckets - 1, int(strength * self.postflop_buckets))
+
+    def bucket(self, hole_cards, board):
+        """Bucket of two hole cards on the board so far (card ints or 'Ah'-style strings)."""
+        hole_cards = [card_from_str(c) if isinstance(c, str) else c for c in hole_cards]
+        board = [card_from_str(c) if isinstance(c, str) else c for c in board]
+        if not board:
+            return hand_class(hole_cards)
+        from HandPotential import hand_potential # Cached per suit-isomorphic spot
+        return self._strength_bucket(hand_potential(hole_cards, board)['hs'])
+
+    def deal_buckets(self, holes, board):
+        """Buckets per street ([preflop, flop, turn, river]) of both players' hole cards on a full board."""
+        buckets = [[hand_class(hole)] for hole in holes]
+        for size in BOARD_SIZES[1:]:
+            strengths = board_hand_strengths(board[:size])
+            for seat, hole in enumerate(holes):
+                buckets[seat].append(self._strength_bucket(strengths[COMBO_INDEX[(max(hole), min(hole))]]))
+        return buckets
+
+
+class BucketFileAbstraction:
+    """Bucket = hand class preflop, the bucket files' equity-distribution clusters after (O(1) lookups)."""
+    name = 'buckets'
+
+    def __init__(self, postflop_buckets):
+        counts = bucket_counts()
+        if any(count != postflop_buckets for count in counts[1:]):
+            raise ValueError(f"The bucket files have {counts[1:]} buckets per street, expected {postflop_buckets} - rebuild them")
+        self.postflop_buckets = postflop_buckets
+
+    def bucket(self, hole_cards, board):
+        """Bucket of two hole cards on the board so far (card ints or 'Ah'-style strings)."""
+        return card_bucket(hole_cards, board)
+
+    def deal_buckets(self, holes, board):
+        """Buckets per street ([preflop, flop, turn, river]) of both players' hole cards on a full board."""
+        return [[hand_class(hole)] + [_get_bucket_table(size).bucket(hole, board[:size]) for size in BOARD_SIZES[1:]] for hole in holes]
+
+
+ABSTRACTIONS = {abstraction.name: abstraction for abstraction in (HandStrengthAbstraction, BucketFileAbstraction)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the card bucket files.")
+    parser.add_argument('--streets', default='flop,turn,river', help="Comma-separated streets to build")
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS, help="Buckets per street")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: every core)")
+    parser.add_argument('--seed', type=int, default=12345)
+    args = parser.parse_args()
+    sizes = {name: size for size, name in STREET_NAMES.items()}
+    streets = [street.strip() for street in args.streets.split(',')]
+    unknown = [street for street in streets if street not in sizes]
+    if unknown:
+        parser.error(f"Unknown street(s): {', '.join(unknown)}. Choose from: {', '.join(sizes)}")
+    start = time.perf_counter()
+    for street in streets:
+        build_bucket_file(sizes[street], args.buckets, workers=args.workers, seed=args.seed)
+    print(f"Done in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Compact integer card encoding shared by Deck, HandEvaluator and PokerGame.
+# A card is a plain int 0..51: card = rank_index * 4 + suit_index
+#   rank_index 0..12 -> '2'..'A', suit_index 0..3 -> 'h', 'd', 'c', 's'
+# Everything about a card is precomputed in the lists below (index them with the card),
+# so hot paths never parse strings. Convert to 'Ah'-style strings only for display/logging.
+
+RANK_CHARS = "23456789TJQKA"
+SUIT_CHARS = "hdcs" # h=hearts, d=diamonds, c=clubs, s=spades
+NUM_CARDS = 52
+
+# Rank number (2..14, Ace high) -> prime, for rank-product hashing of hands
+RANK_PRIMES = {2: 2, 3: 3, 4: 5, 5: 7, 6: 11, 7: 13, 8: 17, 9: 19, 10: 23, 11: 29, 12: 31, 13: 37, 14: 41}
+
+CARD_RANK = [card // 4 + 2 for card in range(NUM_CARDS)] # 2..14, same numbers as HandEvaluator.rank_map
+CARD_SUIT = [card % 4 for card in range(NUM_CARDS)] # 0..3
+CARD_PRIME = [RANK_PRIMES[rank] for rank in CARD_RANK]
+CARD_RANK_BIT = [1 << (rank - 2) for rank in CARD_RANK] # 13-bit rank mask, bit 0 = deuce
+CARD_BIT = [1 << card for card in range(NUM_CARDS)] # 52-bit card set mask (dead cards etc.)
+CARD_STRS = [RANK_CHARS[card // 4] + SUIT_CHARS[card % 4] for card in range(NUM_CARDS)]
+
+_STR_TO_CARD = {card_str: card for card, card_str in enumerate(CARD_STRS)}
+_STR_TO_CARD.update({"10" + s: _STR_TO_CARD["T" + s] for s in SUIT_CHARS}) # Accept '10h' as well as 'Th'
+
+
+def make_card(rank, suit_index):
+    """Card int from a rank number (2..14) and suit index (0..3)."""
+    return (rank - 2) * 4 + suit_index
+
+
+def card_from_str(card_str):
+    """'Ah' -> card int. Raises ValueError for anything that isn't a card."""
+    try:
+        return _STR_TO_CARD[card_str]
+    except KeyError:
+        raise ValueError(f"Invalid card string: {card_str!r}")
+
+
+def card_to_str(card):
+    """Card int -> 'Ah'. Strings are passed through unchanged."""
+    return card if isinstance(card, str) else CARD_STRS[card]
+
+
+def cards_from_str(card_strs):
+    return [card_from_str(s) for s in card_strs]
+
+
+def cards_to_str(cards):
+    """List of card ints -> list of 'Ah'-style strings (for the GUI and logs)."""
+    return [card_to_str(c) for c in cards]
+
+
+def cards_mask(cards):
+    """52-bit mask with one bit set per card."""
+    mask = 0
+    for card in cards:
+        mask |= CARD_BIT[card]
+    return mask
+
+
+def suit_isomorphic_key(*card_groups):
+    """
+    Hashable key that is equal for any two card sets that differ only by a relabeling of suits
+    (e.g. AhKh/2c7c9c and AsKs/2d7d9d). Each group (hole cards, board, ...) is kept apart,
+    so a card may not move between groups. Key = the four per-suit tuples of rank masks, sorted.
+    """
+    per_suit = [[0] * len(card_groups) for _ in range(4)]
+    for group_index, cards in enumerate(card_groups):
+        for card in cards:
+            per_suit[card & 3][group_index] |= CARD_RANK_BIT[card]
+    return tuple(sorted(tuple(masks) for masks in per_suit))
+
+
+def suit_isomorphic_order(*card_groups):
+    """
+    (suit_isomorphic_key(*card_groups), suit_order): suit_order[i] is the real suit behind the key's
+    i-th entry. A result computed for the key's representative cards (entry i in suit i) maps back
+    to the real suits card by card with card - (card & 3) + suit_order[card & 3].
+    """
+    per_suit = [[0] * len(card_groups) for _ in range(4)]
+    for group_index, cards in enumerate(card_groups):
+        for card in cards:
+            per_suit[card & 3][group_index] |= CARD_RANK_BIT[card]
+    suit_order = sorted(range(4), key=per_suit.__getitem__)
+    return tuple(tuple(per_suit[suit]) for suit in suit_order), suit_order
@@ -1,4 +1,11 @@
 import random
+from CardEncoding import NUM_CARDS
+try:
+    import numpy as np
+except ImportError: # Only deal_batch needs NumPy
+    np = None
+
+DEAL_BATCH_CHUNK = 1 << 16 # Deals per vectorized step in deal_batch (bounds temporary memory)
 
 class Deck:
     def __init__(self):
@@ -7,12 +14,8 @@ class Deck:
         self.shuffle()
 
     def build(self):
-        self.cards = []
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        suits = ['h', 'd', 'c', 's'] # h=hearts, d=diamonds, c=clubs, s=spades
-        for suit in suits:
-            for rank in ranks:
-                self.cards.append(rank + suit) # e.g., "Ah", "Td", "7s"
+        # Cards are ints 0..51 (see CardEncoding); use CardEncoding.card_to_str for "Ah"-style display
+        self.cards = list(range(NUM_CARDS))
 
     def shuffle(self):
         random.shuffle(self.cards)
@@ -27,6 +30,54 @@ class Deck:
         if len(self.cards) > 0:
             self.cards.pop() # Remove top card without returning it
 
+    def remove_cards(self, cards):
+        # Takes known cards (hole cards, board, dead cards) out of the deck, e.g. before simulating runouts
+        known = set(cards)
+        self.cards = [card for card in self.cards if card not in known]
+
+    @staticmethod
+    def deal_batch(num_deals, num_cards, dead_cards=0, rng=None):
+        """
+        num_deals independent random deals of num_cards distinct cards, as a (num_deals, num_cards)
+        int array of card ints - one vectorized call instead of a shuffle and pops per deal.
+        dead_cards: 52-bit mask of cards that may not be dealt (see CardEncoding.cards_mask), or a
+        uint64 array with one mask per deal. rng: NumPy Generator (default: a fresh one).
+        Every card gets a random key and the num_cards smallest live keys are dealt, in key order.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for batch dealing.")
+        rng = rng if rng is not None else np.random.default_rng()
+        per_deal_masks = np.ndim(dead_cards) != 0 # A single mask may also be a NumPy integer scalar
+        if per_deal_masks:
+            dead_cards = np.asarray(dead_cards, dtype=np.uint64)
+            if dead_cards.shape != (num_deals,):
+                raise ValueError(f"Expected {num_deals} dead card masks, got shape {dead_cards.shape}")
+            live_cards = np.arange(NUM_CARDS)
+        else:
+            dead_cards = int(dead_cards)
+            live_cards = np.array([card for card in range(NUM_CARDS) if not dead_cards >> card & 1])
+            if num_cards > len(live_cards):
+                raise ValueError(f"Cannot deal {num_cards} cards from {len(live_cards)} live cards")
+
+        deals = np.empty((num_deals, num_cards), dtype=np.int64)
+        if num_cards == 0:
+            return deals
+        card_bits = np.arange(NUM_CARDS, dtype=np.uint64)
+        for start in range(0, num_deals, DEAL_BATCH_CHUNK):
+            stop = min(start + DEAL_BATCH_CHUNK, num_deals)
+            keys = rng.random((stop - start, len(live_cards)))
+            if per_deal_masks:
+                dead = ((dead_cards[start:stop, None] >> card_bits) & np.uint64(1)).astype(bool)
+                if (NUM_CARDS - dead.sum(axis=1) < num_cards).any():
+                    raise ValueError(f"Cannot deal {num_cards} cards: a deal has too many dead cards")
+                keys[dead] = 2.0 # Keys are < 1, so dead cards are never among the smallest
+            picked = np.argpartition(keys, num_cards - 1, axis=1)[:, :num_cards]
+            # argpartition leaves the picked cards in no particular order - sort them by key so the
+            # order they are dealt in (board first, then hands...) is uniformly random too
+            order = np.take_along_axis(keys, picked, axis=1).argsort(axis=1)
+            deals[start:stop] = live_cards[np.take_along_axis(picked, order, axis=1)]
+        return deals
+
     def reset_and_shuffle(self):
         self.build()
         self.shuffle()
@@ -0,0 +1,524 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations, islice
+from math import comb, sqrt
+from statistics import NormalDist
+from CardEncoding import CARD_PRIME, card_from_str, cards_mask, cards_to_str
+from Deck import Deck
+from HandEvaluator import HandEvaluator, HandState, _get_tables
+try:
+    import numpy as np
+except ImportError: # Without NumPy runouts are sampled one at a time in Python
+    np = None
+
+# Hold'em equity: how often known hole cards win/tie against random opponent hands, given a
+# partial board. Runouts are dealt in bulk (Deck.deal_batch), scored with the batch evaluator
+# and spread across a process pool, so bots and the GUI can ask for equity in real time. When few cards are unknown (heads-up on the flop or
+# turn, all-in hands on the flop) every runout is enumerated instead and the result is exact.
+# Usage: python Equity.py AhKh [--board Qh7c2s] [--opponents 2] [--trials 100000] [--method exact]
+
+DEFAULT_TRIALS = 20000
+PARALLEL_MIN_TRIALS = 200000 if np is not None else 20000 # Below this the process pool costs more than it saves
+TRIALS_PER_TASK = 100000 if np is not None else 10000 # Trials per job sent to a worker process
+TRIAL_CHUNK = 1 << 16 # Runouts dealt and scored per vectorized step
+EXACT_MAX_EVALUATIONS = 250000 # 'auto' enumerates when that takes at most about this many hand evaluations
+EVALUATIONS_PER_RUNOUT_VS_RANDOM = 100 # Opponent hands scored per runout after grouping by rank pair (~91 + flush hands)
+EQUITY_METHODS = ('auto', 'exact', 'monte_carlo')
+ANYTIME_FIRST_BATCH = 2000 # Largest first batch of an anytime estimate; later ones are sized from the rate seen
+ANYTIME_MIN_BATCH = 200 # Smallest batch: the first is never smaller (so there is an estimate), later ones stop instead
+ANYTIME_EVALUATIONS_PER_SECOND = 500000 # Rough (low) speed of sampling in hands scored, to size the first batch
+EXACT_EVALUATIONS_PER_SECOND = 500000 # Rough speed of enumeration, to tell whether it fits a time budget
+EXACT_PROJECTION_RUNOUTS = 16 # Runouts timed before projecting whether an enumeration fits its deadline
+
+_RANK_PRIME = [CARD_PRIME[rank_index * 4] for rank_index in range(13)] # Rank index (card >> 2) -> prime
+
+_POOL = None
+_POOL_WORKERS = 0
+_EVALUATOR = None # One table-backed evaluator per process (workers build their own)
+
+
+def _get_evaluator():
+    global _EVALUATOR
+    if _EVALUATOR is None:
+        _EVALUATOR = HandEvaluator(verbose=False, backend='numpy' if np is not None else 'table')
+    return _EVALUATOR
+
+
+def _get_pool(workers):
+    """Process pool shared by every equity call, created on first use and resized if workers changes."""
+    global _POOL, _POOL_WORKERS
+    if _POOL is None or _POOL_WORKERS != workers:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False)
+        _POOL = ProcessPoolExecutor(max_workers=workers)
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def shutdown_pool():
+    """Stops the worker processes (they are otherwise reused until the program exits)."""
+    global _POOL, _POOL_WORKERS
+    if _POOL is not None:
+        _POOL.shutdown()
+    _POOL, _POOL_WORKERS = None, 0
+
+
+def _to_cards(cards):
+    """Card ints from card ints or 'Ah'-style strings."""
+    return [card_from_str(c) if isinstance(c, str) else c for c in cards]
+
+
+def _showdown_shares(hero_scores, opponent_scores):
+    """Hero's pot share per row: 1 for a win, 1/k for a k-way tie, 0 for a loss. opponent_scores is (N, n)."""
+    best = opponent_scores.max(axis=1)
+    tied = (opponent_scores == hero_scores[:, None]).sum(axis=1)
+    return np.where(hero_scores > best, 1.0, np.where(hero_scores == best, 1.0 / (tied + 1), 0.0))
+
+
+def _with_board(cards, board, deals):
+    """(N, k) rows of the fixed cards + the fixed board + the dealt board cards, ready for evaluate_batch."""
+    fixed = np.broadcast_to(np.array(list(cards) + list(board), dtype=np.int64), (len(deals), len(cards) + len(board)))
+    return np.concatenate([fixed, deals], axis=1)
+
+
+def _run_trials(hole_cards, board, num_opponents, dead_cards, num_trials, seed):
+    """
+    Plays num_trials random runouts (rest of the board + every opponent's hole cards).
+    Returns (wins, ties, equity_sum, equity_sq_sum): equity_sum adds 1 per win and 1/k per k-way
+    tie, equity_sq_sum the squares of those (for the standard error). Module level so it can run
+    in a worker process.
+    """
+    if np is None:
+        return _run_trials_python(hole_cards, board, num_opponents, dead_cards, num_trials, seed)
+    evaluator = _get_evaluator()
+    rng = np.random.default_rng(seed)
+    dead_mask = cards_mask(list(hole_cards) + list(board) + list(dead_cards))
+    board_needed = 5 - len(board)
+
+    wins = ties = 0
+    equity_sum = equity_sq_sum = 0.0
+    for start in range(0, num_trials, TRIAL_CHUNK):
+        deals = Deck.deal_batch(min(TRIAL_CHUNK, num_trials - start), board_needed + 2 * num_opponents, dead_mask, rng)
+        runouts = deals[:, :board_needed]
+        hero_scores = evaluator.evaluate_batch(_with_board(hole_cards, board, runouts))
+        opponent_scores = np.stack([
+            evaluator.evaluate_batch(_with_board((), board, np.concatenate([deals[:, i:i + 2], runouts], axis=1)))
+            for i in range(board_needed, deals.shape[1], 2)], axis=1)
+        best_opponent = opponent_scores.max(axis=1)
+        wins += int((hero_scores > best_opponent).sum())
+        ties += int((hero_scores == best_opponent).sum())
+        shares = _showdown_shares(hero_scores, opponent_scores)
+        equity_sum += float(shares.sum())
+        equity_sq_sum += float((shares * shares).sum())
+    return wins, ties, equity_sum, equity_sq_sum
+
+
+def _run_trials_python(hole_cards, board, num_opponents, dead_cards, num_trials, seed):
+    """_run_trials one runout at a time, for when NumPy isn't installed."""
+    evaluator = _get_evaluator()
+    rng = random.Random(seed)
+    deck = Deck()
+    deck.remove_cards(list(hole_cards) + list(board) + list(dead_cards))
+    stub = sorted(deck.cards) # Fixed order, so the seed alone decides the runouts
+    board_needed = 5 - len(board)
+    num_drawn = board_needed + 2 * num_opponents
+
+    wins = ties = 0
+    equity_sum = equity_sq_sum = 0.0
+    for _ in range(num_trials):
+        drawn = rng.sample(stub, num_drawn)
+        full_board = list(board) + drawn[:board_needed]
+        hero_strength = evaluator.hand_strength(hole_cards, full_board)
+        best_opponent = 0
+        tied = 1
+        for i in range(board_needed, num_drawn, 2):
+            strength = evaluator.hand_strength(drawn[i:i + 2], full_board)
+            if strength > best_opponent:
+                best_opponent = strength
+                if strength > hero_strength: break # Lost - the other opponents don't matter
+            if strength == hero_strength:
+                tied += 1
+        if hero_strength > best_opponent:
+            wins += 1
+            equity_sum += 1
+            equity_sq_sum += 1
+        elif hero_strength == best_opponent:
+            ties += 1
+            equity_sum += 1 / tied
+            equity_sq_sum += 1 / tied ** 2
+    return wins, ties, equity_sum, equity_sq_sum
+
+
+def _exact_vs_random(hole_cards, board, dead_cards):
+    """
+    Exact equity against one random hand: every runout, and for each runout every opponent hand.
+    Returns (wins, ties, equity_sum, deals) counted over all deals.
+    """
+    stub = _stub(hole_cards, board, dead_cards)
+    totals = [0, 0, 0.0, 0]
+    for runout in combinations(stub, 5 - len(board)):
+        totals = [a + b for a, b in zip(totals, _exact_runout_vs_random(hole_cards, board, stub, runout))]
+    return tuple(totals)
+
+
+def _stub(hole_cards, board, dead_cards):
+    """The cards left to deal, in a fixed order."""
+    deck = Deck()
+    deck.remove_cards(list(hole_cards) + list(board) + list(dead_cards))
+    return sorted(deck.cards)
+
+
+def _exact_runout_vs_random(hole_cards, board, stub, runout):
+    """
+    One runout of _exact_vs_random, against every opponent hand left in stub.
+    Opponent hands that can't use a flush score the same for every suit combination of their two
+    ranks, so they are grouped by rank pair - one table lookup per group, weighted by its combos.
+    Only hands holding cards of a suit with 3+ board cards are scored one by one.
+    Returns (wins, ties, equity_sum, deals).
+    """
+    evaluator = _get_evaluator()
+    rank_table, flush_table = _get_tables()
+    wins = ties = deals = 0
+    equity_sum = 0.0
+    full_board = list(board) + list(runout)
+    hero_strength = evaluator.hand_strength(hole_cards, full_board)
+    board_state = HandState(full_board)
+    board_flush = max(flush_table[mask] for mask in board_state.suit_masks) # Five suited board cards
+    unseen = [card for card in stub if card not in runout]
+
+    rank_counts = [0] * 13
+    for card in unseen:
+        rank_counts[card >> 2] += 1
+    class_combos = {} # (rank index, rank index) -> opponent combos not scored one by one
+    for high in range(13):
+        if rank_counts[high] >= 2:
+            class_combos[(high, high)] = comb(rank_counts[high], 2)
+        for low in range(high):
+            if rank_counts[high] and rank_counts[low]:
+                class_combos[(high, low)] = rank_counts[high] * rank_counts[low]
+
+    opponent_strengths = []
+    for suit, mask in enumerate(board_state.suit_masks):
+        suit_count = bin(mask).count('1')
+        if suit_count < 3: continue
+        suited = [card for card in unseen if card & 3 == suit]
+        if suit_count == 3: # Both hole cards must be in the suit
+            flush_combos = combinations(suited, 2)
+        else: # Any hand with at least one card of the suit
+            flush_combos = [(a, b) for a in suited for b in unseen if b & 3 != suit or b > a]
+        for a, b in flush_combos:
+            class_combos[(max(a, b) >> 2, min(a, b) >> 2)] -= 1
+            opponent_strengths.append((evaluator.hand_strength((a, b), full_board), 1))
+    for (high, low), num_combos in class_combos.items():
+        if num_combos:
+            strength = rank_table[board_state.product * _RANK_PRIME[high] * _RANK_PRIME[low]]
+            opponent_strengths.append((max(strength, board_flush), num_combos))
+
+    for strength, num_combos in opponent_strengths:
+        deals += num_combos
+        if hero_strength > strength:
+            wins += num_combos
+            equity_sum += num_combos
+        elif hero_strength == strength:
+            ties += num_combos
+            equity_sum += num_combos / 2
+    return wins, ties, equity_sum, deals
+
+
+def _exact_until(hole_cards, board, dead_cards, deadline, seed):
+    """
+    _exact_vs_random on a clock. Runouts go in random order, so the time taken so far projects the
+    total; as soon as the enumeration won't end by deadline it stops and returns None (flush-heavy
+    boards score many hands one by one and can run several times slower than the usual rate).
+    """
+    stub = _stub(hole_cards, board, dead_cards)
+    runouts = list(combinations(stub, 5 - len(board)))
+    random.Random(seed).shuffle(runouts)
+    _get_tables() # Loaded before the clock starts, so the first runouts project the true rate
+    start = time.perf_counter()
+    totals = [0, 0, 0.0, 0]
+    for done, runout in enumerate(runouts):
+        now = time.perf_counter()
+        if now >= deadline or (done >= EXACT_PROJECTION_RUNOUTS and start + (now - start) * len(runouts) / done > deadline):
+            return None
+        totals = [a + b for a, b in zip(totals, _exact_runout_vs_random(hole_cards, board, stub, runout))]
+    return tuple(totals)
+
+
+def _showdown_tally(strengths, totals):
+    """Adds one runout's result to totals ([wins, ties, equity_sum] per hand, flattened)."""
+    best = max(strengths)
+    winners = [i for i, strength in enumerate(strengths) if strength == best]
+    for i in winners:
+        if len(winners) == 1:
+            totals[3 * i] += 1
+        else:
+            totals[3 * i + 1] += 1
+        totals[3 * i + 2] += 1 / len(winners)
+
+
+def _tally_showdown_scores(scores, totals):
+    """Vectorized _showdown_tally for an (N, hands) score array, added into a NumPy totals array."""
+    winners = scores == scores.max(axis=1)[:, None]
+    num_winners = winners.sum(axis=1)[:, None]
+    totals[0::3] += (winners & (num_winners == 1)).sum(axis=0)
+    totals[1::3] += (winners & (num_winners > 1)).sum(axis=0)
+    totals[2::3] += (winners / num_winners).sum(axis=0)
+
+
+def _run_showdown_trials(hands, board, dead_cards, num_trials, seed):
+    """Random runouts for fully known hands (an all-in). Returns [wins, ties, equity_sum] per hand, flattened."""
+    evaluator = _get_evaluator()
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        dead_mask = cards_mask([card for hand in hands for card in hand] + list(board) + list(dead_cards))
+        totals = np.zeros(3 * len(hands))
+        for start in range(0, num_trials, TRIAL_CHUNK):
+            runouts = Deck.deal_batch(min(TRIAL_CHUNK, num_trials - start), 5 - len(board), dead_mask, rng)
+            scores = np.stack([evaluator.evaluate_batch(_with_board(hand, board, runouts)) for hand in hands], axis=1)
+            _tally_showdown_scores(scores, totals)
+        return totals.tolist()
+
+    rng = random.Random(seed)
+    deck = Deck()
+    deck.remove_cards([card for hand in hands for card in hand] + list(board) + list(dead_cards))
+    stub = sorted(deck.cards)
+    totals = [0] * (3 * len(hands))
+    for _ in range(num_trials):
+        full_board = list(board) + rng.sample(stub, 5 - len(board))
+        _showdown_tally([evaluator.hand_strength(hand, full_board) for hand in hands], totals)
+    return totals
+
+
+def _exact_showdown(hands, board, dead_cards):
+    """Every runout for fully known hands. Returns ([wins, ties, equity_sum] per hand flattened, runouts).
+       With NumPy the runouts are enumerated in chunks and every hand is scored with one batch call
+       per chunk, so the cost grows with runouts x hands but not with Python overhead per hand."""
+    evaluator = _get_evaluator()
+    deck = Deck()
+    deck.remove_cards([card for hand in hands for card in hand] + list(board) + list(dead_cards))
+    missing = 5 - len(board)
+    runouts = 0
+    if np is not None:
+        totals = np.zeros(3 * len(hands))
+        all_runouts = combinations(sorted(deck.cards), missing)
+        while True:
+            if missing:
+                chunk = np.fromiter(chain.from_iterable(islice(all_runouts, TRIAL_CHUNK)), dtype=np.int64).reshape(-1, missing)
+            else: # River: the one (empty) runout
+                chunk = np.zeros((0 if runouts else 1, 0), dtype=np.int64)
+            if not len(chunk): break
+            scores = np.stack([evaluator.evaluate_batch(_with_board(hand, board, chunk)) for hand in hands], axis=1)
+            _tally_showdown_scores(scores, totals)
+            runouts += len(chunk)
+        return totals.tolist(), runouts
+
+    totals = [0] * (3 * len(hands))
+    for runout in combinations(sorted(deck.cards), missing):
+        full_board = list(board) + list(runout)
+        _showdown_tally([evaluator.hand_strength(hand, full_board) for hand in hands], totals)
+        runouts += 1
+    return totals, runouts
+
+
+def _run_parallel(worker, args, num_trials, workers, seed):
+    """
+    Runs worker(*args, trials, seed) for num_trials trials in total and sums the returned
+    lists/tuples element-wise. Big requests are split into seeded jobs on the process pool.
+    """
+    seeds = random.Random(seed)
+    if workers == 1 or num_trials < PARALLEL_MIN_TRIALS:
+        return list(worker(*args, num_trials, seeds.getrandbits(64)))
+    # Split the trials into jobs, each with its own seed so workers don't repeat each other
+    jobs = [TRIALS_PER_TASK] * (num_trials // TRIALS_PER_TASK)
+    if num_trials % TRIALS_PER_TASK:
+        jobs.append(num_trials % TRIALS_PER_TASK)
+    pool = _get_pool(workers)
+    futures = [pool.submit(worker, *args, job_trials, seeds.getrandbits(64)) for job_trials in jobs]
+    totals = None
+    for future in futures:
+        result = future.result()
+        totals = list(result) if totals is None else [a + b for a, b in zip(totals, result)]
+    return totals
+
+
+def _check_spot(hole_cards, board, num_opponents, dead_cards):
+    if len(hole_cards) != 2:
+        raise ValueError(f"Need exactly 2 hole cards, got {len(hole_cards)}")
+    if len(board) > 5:
+        raise ValueError(f"A board has at most 5 cards, got {len(board)}")
+    if num_opponents < 1:
+        raise ValueError("Need at least one opponent")
+    known = list(hole_cards) + list(board) + list(dead_cards)
+    if len(set(known)) != len(known):
+        raise ValueError(f"Duplicate cards: {cards_to_str(known)}")
+    if len(known) + (5 - len(board)) + 2 * num_opponents > 52:
+        raise ValueError(f"Not enough cards left to deal {num_opponents} opponents")
+
+
+def _pick_method(method, exact_evaluations):
+    """Resolves 'auto' from the work enumeration would take (None = enumeration not supported)."""
+    if method not in EQUITY_METHODS:
+        raise ValueError(f"Unknown equity method '{method}'. Choose from: {', '.join(EQUITY_METHODS)}")
+    if method == 'auto':
+        return 'exact' if exact_evaluations is not None and exact_evaluations <= EXACT_MAX_EVALUATIONS else 'monte_carlo'
+    return method
+
+
+def calculate_equity(hole_cards, board=(), num_opponents=1, num_trials=DEFAULT_TRIALS, dead_cards=(), workers=None, seed=None,
+                     method='auto'):
+    """
+    Equity of hole_cards against num_opponents random hands.
+    Cards are ints from CardEncoding ('Ah'-style strings are accepted); board may have 0-5 cards,
+    dead_cards are known to be out of play (folded/burnt cards you have seen).
+    method: 'monte_carlo' samples num_trials runouts, 'exact' enumerates every deal (one opponent
+    only), 'auto' enumerates when the space left is small enough (flop, turn and river heads-up)
+    and samples otherwise.
+    workers: worker processes (default: all CPUs; 1 = run in this process). seed makes runs repeatable.
+    Returns {'win', 'tie', 'equity', 'trials', 'method'}: win/tie are fractions of trials (deals
+    when exact), equity counts a k-way tie as 1/k of a win.
+    """
+    hole_cards, board, dead_cards = _to_cards(hole_cards), _to_cards(board), _to_cards(dead_cards)
+    _check_spot(hole_cards, board, num_opponents, dead_cards)
+    num_unseen = 52 - len(hole_cards) - len(board) - len(dead_cards)
+    runouts = comb(num_unseen, 5 - len(board))
+    method = _pick_method(method, runouts * EVALUATIONS_PER_RUNOUT_VS_RANDOM if num_opponents == 1 else None)
+
+    if method == 'exact':
+        if num_opponents != 1:
+            raise ValueError("Exact equity enumerates one random opponent; use showdown_equity for known hands")
+        wins, ties, equity_sum, num_trials = _exact_vs_random(hole_cards, board, dead_cards)
+    else:
+        wins, ties, equity_sum, _ = _run_parallel(_run_trials, (hole_cards, board, num_opponents, dead_cards),
+                                                  num_trials, workers or os.cpu_count() or 1, seed)
+
+    return {'win': wins / num_trials, 'tie': ties / num_trials, 'equity': equity_sum / num_trials,
+            'trials': num_trials, 'method': method}
+
+
+def estimate_equity(hole_cards, board=(), num_opponents=1, time_budget=None, target_stderr=None, dead_cards=(), confidence=0.95,
+                    max_trials=None, seed=None):
+    """
+    Anytime equity for decisions on a clock: samples in batches (in this process) until
+    time_budget seconds have passed, the standard error drops to target_stderr or max_trials
+    are done - whichever comes first (at least one must be given). Spots small enough to
+    enumerate (within the time budget) are solved exactly instead; an enumeration that turns out
+    too slow for the budget is dropped early and the time left is spent sampling.
+    Returns calculate_equity's dict plus 'stderr', 'ci_low', 'ci_high' (confidence interval
+    of the equity at the given confidence level) and 'elapsed' seconds.
+    """
+    start = time.perf_counter()
+    if time_budget is None and target_stderr is None and max_trials is None:
+        raise ValueError("Give a time_budget, target_stderr or max_trials")
+    hole_cards, board, dead_cards = _to_cards(hole_cards), _to_cards(board), _to_cards(dead_cards)
+    _check_spot(hole_cards, board, num_opponents, dead_cards)
+
+    num_unseen = 52 - len(hole_cards) - len(board) - len(dead_cards)
+    exact_evaluations = comb(num_unseen, 5 - len(board)) * EVALUATIONS_PER_RUNOUT_VS_RANDOM if num_opponents == 1 else None
+    if exact_evaluations is not None and time_budget is not None and exact_evaluations > time_budget * EXACT_EVALUATIONS_PER_SECOND:
+        exact_evaluations = None # Enumeration wouldn't finish in time, sample instead
+    deadline = start + time_budget if time_budget is not None else None
+    seeds = random.Random(seed)
+    if _pick_method('auto', exact_evaluations) == 'exact':
+        if deadline is None:
+            exact = _exact_vs_random(hole_cards, board, dead_cards)
+        else: # The rate above is only a guess - give up and sample if this board enumerates too slowly
+            exact = _exact_until(hole_cards, board, dead_cards, deadline, seeds.getrandbits(64))
+        if exact is not None:
+            wins, ties, equity_sum, deals = exact
+            equity = equity_sum / deals
+            return {'win': wins / deals, 'tie': ties / deals, 'equity': equity, 'trials': deals, 'method': 'exact',
+                    'stderr': 0.0, 'ci_low': equity, 'ci_high': equity, 'elapsed': time.perf_counter() - start}
+
+    totals = [0, 0, 0.0, 0.0] # wins, ties, equity_sum, equity_sq_sum
+    trials = 0
+    batch = ANYTIME_FIRST_BATCH
+    if deadline is not None: # Fit the first batch in the time left (enumeration may have used some or all of it)
+        time_left = max(0.0, deadline - time.perf_counter())
+        batch = max(ANYTIME_MIN_BATCH, min(batch, int(time_left * 0.8 * ANYTIME_EVALUATIONS_PER_SECOND / (num_opponents + 1))))
+    if max_trials is not None:
+        batch = min(batch, max_trials)
+    while True:
+        batch_start = time.perf_counter()
+        batch_totals = _run_trials(hole_cards, board, num_opponents, dead_cards, batch, seeds.getrandbits(64))
+        totals = [a + b for a, b in zip(totals, batch_totals)]
+        trials += batch
+        now = time.perf_counter()
+
+        equity = totals[2] / trials
+        variance = max(0.0, totals[3] / trials - equity * equity)
+        stderr = sqrt(variance / (trials - 1)) if trials > 1 else float('inf')
+        if target_stderr is not None and stderr <= target_stderr: break
+        if max_trials is not None and trials >= max_trials: break
+        if deadline is not None:
+            # Size the next batch to end well inside the deadline at the rate seen so far
+            rate = batch / max(now - batch_start, 1e-6)
+            batch = min(int(rate * (deadline - now) * 0.8), TRIAL_CHUNK)
+            if batch < ANYTIME_MIN_BATCH: break
+        else:
+            batch = min(batch * 2, TRIAL_CHUNK)
+        if max_trials is not None:
+            batch = min(batch, max_trials - trials)
+
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * stderr
+    return {'win': totals[0] / trials, 'tie': totals[1] / trials, 'equity': equity, 'trials': trials, 'method': 'monte_carlo',
+            'stderr': stderr, 'ci_low': max(0.0, equity - margin), 'ci_high': min(1.0, equity + margin),
+            'elapsed': time.perf_counter() - start}
+
+
+def showdown_equity(hands, board=(), dead_cards=(), num_trials=DEFAULT_TRIALS, workers=None, seed=None, method='auto'):
+    """
+    Equity of each of several known hands against each other (an all-in with cards face up).
+    hands is a list of 2-card hands; the rest is as calculate_equity. From the flop on every
+    runout is enumerated by default ('auto'), so the percentages are exact.
+    Returns one {'win', 'tie', 'equity', 'trials', 'method'} dict per hand, in the same order.
+    """
+    hands = [_to_cards(hand) for hand in hands]
+    board, dead_cards = _to_cards(board), _to_cards(dead_cards)
+    if len(hands) < 2:
+        raise ValueError("Need at least two hands")
+    for hand in hands:
+        if len(hand) != 2:
+            raise ValueError(f"Need exactly 2 hole cards per hand, got {cards_to_str(hand)}")
+    known = [card for hand in hands for card in hand] + board + dead_cards
+    if len(set(known)) != len(known):
+        raise ValueError(f"Duplicate cards: {cards_to_str(known)}")
+    if len(board) > 5:
+        raise ValueError(f"A board has at most 5 cards, got {len(board)}")
+    method = _pick_method(method, comb(52 - len(known), 5 - len(board)) * len(hands))
+
+    if method == 'exact':
+        totals, num_trials = _exact_showdown(hands, board, dead_cards)
+    else:
+        totals = _run_parallel(_run_showdown_trials, (hands, board, dead_cards), num_trials, workers or os.cpu_count() or 1, seed)
+    return [{'win': totals[3 * i] / num_trials, 'tie': totals[3 * i + 1] / num_trials,
+             'equity': totals[3 * i + 2] / num_trials, 'trials': num_trials, 'method': method}
+            for i in range(len(hands))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold'em equity against random hands.")
+    parser.add_argument('hole', help="Hole cards, e.g. AhKh")
+    parser.add_argument('--board', default='', help="Board cards so far, e.g. Qh7c2s")
+    parser.add_argument('--opponents', type=int, default=1)
+    parser.add_argument('--trials', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--method', choices=EQUITY_METHODS, default='auto')
+    args = parser.parse_args()
+
+    split = lambda s: [s[i:i + 2] for i in range(0, len(s), 2)]
+    start = time.perf_counter()
+    result = calculate_equity(split(args.hole), split(args.board), args.opponents, args.trials, workers=args.workers, seed=args.seed,
+                              method=args.method)
+    elapsed = time.perf_counter() - start
+    print(f"{args.hole} vs {args.opponents} random hand(s), board [{args.board}]: "
+          f"equity {result['equity']:.2%} (win {result['win']:.2%}, tie {result['tie']:.2%})")
+    print(f"{result['trials']:,} {'deals' if result['method'] == 'exact' else 'trials'} ({result['method']}) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
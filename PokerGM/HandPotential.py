@@ -0,0 +1,118 @@
+import functools
+from itertools import combinations
+from CardEncoding import card_from_str, cards_mask, make_card, suit_isomorphic_key
+from HandEvaluator import _score_cards
+try:
+    import numpy as np
+except ImportError: # Without NumPy the enumeration runs one hand at a time
+    np = None
+
+# Effective hand strength (Billings et al.): how good a hand is now and how it may change.
+#   HS   - share of opponent hands we beat right now (ties count half)
+#   PPot - chance a hand that is behind/tied now is ahead after the next card
+#   NPot - chance a hand that is ahead/tied now falls behind after the next card
+#   EHS  - HS^n * (1 - NPot) + (1 - HS^n) * PPot, for n opponents
+# Every opponent holding and every next card is enumerated with the fast evaluator. Results
+# are cached per suit-isomorphic (hole, board) key, since bots ask the same question several
+# times per street.
+
+HAND_POTENTIAL_CACHE_SIZE = 4096
+AHEAD, TIED, BEHIND = 0, 1, 2
+
+
+def _compare(hero, opponent):
+    return AHEAD if hero > opponent else TIED if hero == opponent else BEHIND
+
+
+def _potential_counts_numpy(hole_cards, board):
+    """(counts now [3], transition counts [3][3] now -> after the next card) over all opponent hands."""
+    from Equity import _get_evaluator # Shared per-process batch evaluator
+    evaluate_batch = _get_evaluator().evaluate_batch
+    dead_mask = cards_mask(list(hole_cards) + list(board))
+    unseen = np.array([card for card in range(52) if not dead_mask >> card & 1], dtype=np.int64)
+    opponents = np.array(list(combinations(unseen.tolist(), 2)), dtype=np.int64)
+    board_array = np.array(board, dtype=np.int64)
+
+    def with_board(cards, extra=None):
+        fixed = np.broadcast_to(board_array, (len(cards), len(board)))
+        parts = [cards, fixed] if extra is None else [cards, fixed, extra[:, None]]
+        return np.concatenate(parts, axis=1)
+
+    hero_now = int(evaluate_batch(np.array([list(hole_cards) + list(board)], dtype=np.int64))[0]) # Batch path: no scalar rank dict in workers
+    opponent_now = evaluate_batch(with_board(opponents))
+    state_now = np.where(hero_now > opponent_now, AHEAD, np.where(hero_now == opponent_now, TIED, BEHIND))
+    counts_now = np.bincount(state_now, minlength=3)
+
+    transitions = np.zeros((3, 3), dtype=np.int64)
+    if len(board) < 5:
+        # Every (next card, opponent hand) pair that doesn't share a card
+        card_index = np.repeat(np.arange(len(unseen)), len(opponents))
+        pair_index = np.tile(np.arange(len(opponents)), len(unseen))
+        next_cards = unseen[card_index]
+        valid = (next_cards != opponents[pair_index, 0]) & (next_cards != opponents[pair_index, 1])
+        card_index, pair_index, next_cards = card_index[valid], pair_index[valid], next_cards[valid]
+        hero_next = evaluate_batch(with_board(np.broadcast_to(np.array(hole_cards, dtype=np.int64), (len(unseen), 2)), unseen))
+        hero_after = hero_next[card_index]
+        opponent_after = evaluate_batch(with_board(opponents[pair_index], next_cards))
+        state_after = np.where(hero_after > opponent_after, AHEAD, np.where(hero_after == opponent_after, TIED, BEHIND))
+        transitions = np.bincount(state_now[pair_index] * 3 + state_after, minlength=9).reshape(3, 3)
+    return counts_now.tolist(), transitions.tolist()
+
+
+def _potential_counts_python(hole_cards, board):
+    """_potential_counts_numpy one hand at a time."""
+    dead_mask = cards_mask(list(hole_cards) + list(board))
+    unseen = [card for card in range(52) if not dead_mask >> card & 1]
+    hero_now = _score_cards(list(hole_cards) + list(board))
+    hero_next = {card: _score_cards(list(hole_cards) + list(board) + [card]) for card in unseen} if len(board) < 5 else {}
+    counts_now = [0, 0, 0]
+    transitions = [[0, 0, 0] for _ in range(3)]
+    for opponent in combinations(unseen, 2):
+        state_now = _compare(hero_now, _score_cards(list(opponent) + list(board)))
+        counts_now[state_now] += 1
+        for card in hero_next:
+            if card in opponent: continue
+            transitions[state_now][_compare(hero_next[card], _score_cards(list(opponent) + list(board) + [card]))] += 1
+    return counts_now, transitions
+
+
+@functools.lru_cache(maxsize=HAND_POTENTIAL_CACHE_SIZE)
+def _potential_from_key(key):
+    """(HS, PPot, NPot) for a suit_isomorphic_key(hole, board); any representative of the key scores the same."""
+    hole_cards = [make_card(rank, suit) for suit, (hole_mask, _) in enumerate(key) for rank in range(2, 15) if hole_mask >> (rank - 2) & 1]
+    board = [make_card(rank, suit) for suit, (_, board_mask) in enumerate(key) for rank in range(2, 15) if board_mask >> (rank - 2) & 1]
+    if np is not None:
+        counts_now, transitions = _potential_counts_numpy(hole_cards, board)
+    else:
+        counts_now, transitions = _potential_counts_python(hole_cards, board)
+
+    hand_strength = (counts_now[AHEAD] + counts_now[TIED] / 2) / sum(counts_now)
+    row_totals = [sum(row) for row in transitions]
+    ppot_base = row_totals[BEHIND] + row_totals[TIED] / 2
+    npot_base = row_totals[AHEAD] + row_totals[TIED] / 2
+    ppot = (transitions[BEHIND][AHEAD] + transitions[BEHIND][TIED] / 2 + transitions[TIED][AHEAD] / 2) / ppot_base if ppot_base else 0.0
+    npot = (transitions[AHEAD][BEHIND] + transitions[TIED][BEHIND] / 2 + transitions[AHEAD][TIED] / 2) / npot_base if npot_base else 0.0
+    return hand_strength, ppot, npot
+
+
+def hand_potential(hole_cards, board, num_opponents=1):
+    """
+    HS, PPot, NPot and EHS of two hole cards on a 3-5 card board (card ints or 'Ah'-style strings).
+    PPot/NPot look one card ahead (both are 0 on the river). num_opponents scales HS as HS^n.
+    Returns {'hs', 'ppot', 'npot', 'ehs'}; 'hs' is against a single opponent.
+    """
+    hole_cards = [card_from_str(c) if isinstance(c, str) else c for c in hole_cards]
+    board = [card_from_str(c) if isinstance(c, str) else c for c in board]
+    if len(hole_cards) != 2 or not 3 <= len(board) <= 5:
+        raise ValueError(f"Need 2 hole cards and a 3-5 card board, got {len(hole_cards)} and {len(board)}")
+    if len(set(hole_cards + board)) != len(hole_cards + board):
+        raise ValueError("Duplicate cards in hole cards and board")
+
+    hand_strength, ppot, npot = _potential_from_key(suit_isomorphic_key(hole_cards, board))
+    hs_n = hand_strength ** max(1, num_opponents)
+    return {'hs': hand_strength, 'ppot': ppot, 'npot': npot, 'ehs': hs_n * (1 - npot) + (1 - hs_n) * ppot}
+
+
+def hand_potential_cache_info():
+    """Hits, misses and size of the hand potential cache."""
+    return _potential_from_key.cache_info()
@@ -0,0 +1,257 @@
+import re
+from itertools import combinations
+from math import comb
+from CardEncoding import CARD_BIT, RANK_CHARS, card_from_str, cards_mask
+from Deck import Deck
+from PreflopEquity import class_combos, class_index
+try:
+    import numpy as np
+except ImportError: # Parsing works without NumPy; range equity needs it
+    np = None
+
+# Hand ranges in the usual notation, expanded to weighted 2-card combos.
+#   "QQ+, AKs, A5s-A2s, 76s-54s, KTo+, AK, 50% of AJo, T9s:0.5, AhKh"
+#   QQ+     pairs QQ and up          A2s+    kicker 2 up to just below the top card
+#   76s-54s same gap, stepping down  A5s-A2s same top card, kicker range
+#   AK      suited and offsuit       AhKh    one specific combo
+#   A weight (0..1) applies with "N% of X" or "X:w"; a later token overrides an earlier one.
+# Range-vs-range equity runs on combo indexes with precomputed card masks and batch evaluation.
+
+# Every 2-card combo, higher card first; index into these with a combo index 0..1325
+COMBOS = [(high, low) for high in range(52) for low in range(high)]
+COMBO_INDEX = {combo: i for i, combo in enumerate(COMBOS)}
+COMBO_MASKS = [CARD_BIT[high] | CARD_BIT[low] for high, low in COMBOS]
+
+DEFAULT_RANGE_TRIALS = 50000
+RANGE_EXACT_MAX_PAIRS = 20000000 # 'auto' enumerates when runouts x combo pairs is at most this...
+RANGE_EXACT_MAX_RUNOUTS = 2000 # ...and there are at most this many runouts (flop or later)
+RANGE_CHUNK = 1 << 15 # Combo pairs dealt and scored per vectorized step
+EQUITY_METHODS = ('auto', 'exact', 'monte_carlo')
+
+_WEIGHT_PREFIX = re.compile(r"^(\d+(?:\.\d+)?)\s*%\s*(?:of\s+)?(.+)$", re.IGNORECASE)
+
+
+def combo_index(cards):
+    """Combo index of two card ints (either order)."""
+    first, second = cards
+    return COMBO_INDEX[(first, second) if first > second else (second, first)]
+
+
+def _to_cards(cards):
+    """Card ints from card ints or 'Ah'-style strings."""
+    return [card_from_str(c) if isinstance(c, str) else c for c in cards]
+
+
+def _rank(char):
+    char = char.upper()
+    if char not in RANK_CHARS:
+        raise ValueError(f"Invalid rank: {char!r}")
+    return RANK_CHARS.index(char)
+
+
+def _class_names(high, low, suffix):
+    """Class names for two rank indexes; no suffix means both suited and offsuit."""
+    if high == low:
+        return [RANK_CHARS[high] * 2]
+    if high < low:
+        high, low = low, high
+    suffixes = [suffix] if suffix else ['s', 'o']
+    return [RANK_CHARS[high] + RANK_CHARS[low] + s for s in suffixes]
+
+
+def _split_class(token):
+    """'AKs' -> (12, 11, 's'). Raises ValueError for anything else."""
+    if len(token) not in (2, 3) or (len(token) == 3 and token[2].lower() not in 'so'):
+        raise ValueError(f"Invalid hand: {token!r}")
+    high, low = _rank(token[0]), _rank(token[1])
+    if high == low and len(token) == 3:
+        raise ValueError(f"Pairs take no suit suffix: {token!r}")
+    return max(high, low), min(high, low), token[2:].lower()
+
+
+def _expand_token(token):
+    """Combo indexes for one token without its weight."""
+    if len(token) == 4 and token[:2].upper() != token[2:].upper():
+        try: # A specific combo such as AhKh
+            first, second = card_from_str(token[0].upper() + token[1].lower()), card_from_str(token[2].upper() + token[3].lower())
+        except ValueError:
+            first = second = None
+        if first is not None:
+            if first == second:
+                raise ValueError(f"Invalid combo: {token!r}")
+            return [combo_index((first, second))]
+
+    names = []
+    if token.endswith('+'):
+        high, low, suffix = _split_class(token[:-1])
+        if high == low: # QQ+ -> QQ, KK, AA
+            names = [name for rank in range(high, 13) for name in _class_names(rank, rank, '')]
+        else: # A2s+ -> A2s .. AKs
+            names = [name for kicker in range(low, high) for name in _class_names(high, kicker, suffix)]
+    elif '-' in token:
+        left, right = (_split_class(part.strip()) for part in token.split('-', 1))
+        if left[2] != right[2]:
+            raise ValueError(f"Both ends of a range need the same suffix: {token!r}")
+        (top_high, top_low, suffix), (bottom_high, bottom_low, _) = sorted([left, right], reverse=True)
+        if top_high == top_low and bottom_high == bottom_low: # 88-QQ
+            names = [name for rank in range(bottom_high, top_high + 1) for name in _class_names(rank, rank, '')]
+        elif top_high == bottom_high: # A5s-A2s
+            names = [name for kicker in range(bottom_low, top_low + 1) for name in _class_names(top_high, kicker, suffix)]
+        elif top_high - top_low == bottom_high - bottom_low: # 76s-54s
+            names = [name for step in range(top_high - bottom_high + 1)
+                     for name in _class_names(bottom_high + step, bottom_low + step, suffix)]
+        else:
+            raise ValueError(f"Can't expand range {token!r}: ends need the same top card or the same gap")
+    else:
+        high, low, suffix = _split_class(token)
+        names = _class_names(high, low, suffix)
+    return [combo_index(cards) for name in names for cards in class_combos(class_index(name))]
+
+
+class HandRange:
+    """A weighted set of 2-card combos parsed from range notation (see the top of this module)."""
+
+    def __init__(self, text=""):
+        self.weights = {} # combo index -> weight (0..1]
+        for token in text.split(','):
+            token = token.strip()
+            if not token: continue
+            weight = 1.0
+            match = _WEIGHT_PREFIX.match(token)
+            if match:
+                weight, token = float(match.group(1)) / 100, match.group(2).strip()
+            elif ':' in token:
+                token, weight_text = token.rsplit(':', 1)
+                token, weight = token.strip(), float(weight_text)
+            if not 0 <= weight <= 1:
+                raise ValueError(f"Weight must be between 0 and 1 (or 0-100%): {token!r}")
+            for index in _expand_token(token):
+                if weight > 0:
+                    self.weights[index] = weight
+                else:
+                    self.weights.pop(index, None)
+
+    @classmethod
+    def from_combos(cls, combos, weight=1.0):
+        """Range of specific combos (pairs of card ints)."""
+        hand_range = cls()
+        for cards in combos:
+            hand_range.weights[combo_index(cards)] = weight
+        return hand_range
+
+    def combos(self, dead_cards=()):
+        """[(combo, weight)] with combos as (high card, low card), leaving out combos that use a dead card."""
+        dead_mask = cards_mask(_to_cards(dead_cards))
+        return [(COMBOS[i], w) for i, w in sorted(self.weights.items()) if not COMBO_MASKS[i] & dead_mask]
+
+    def num_combos(self, dead_cards=()):
+        """Weighted number of combos left after card removal."""
+        return sum(weight for _, weight in self.combos(dead_cards))
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __repr__(self):
+        return f"HandRange({len(self.weights)} combos, {self.num_combos():.1f} weighted)"
+
+
+def _as_range(hand_range):
+    return hand_range if isinstance(hand_range, HandRange) else HandRange(hand_range)
+
+
+def _live_combos(hand_range, dead_mask):
+    """(combo cards (n, 2), masks (n,), weights (n,)) arrays of the combos not using a dead card."""
+    items = [(i, w) for i, w in sorted(hand_range.weights.items()) if not COMBO_MASKS[i] & dead_mask]
+    indexes = np.array([i for i, _ in items], dtype=np.int64)
+    cards = np.array([COMBOS[i] for i in indexes.tolist()], dtype=np.int64).reshape(-1, 2)
+    masks = np.array([COMBO_MASKS[i] for i in indexes.tolist()], dtype=np.uint64)
+    return cards, masks, np.array([w for _, w in items], dtype=np.float64)
+
+
+def _exact_range_equity(evaluator, combos_a, combos_b, board, dead_mask):
+    """Every runout; per runout each live combo is scored once and all combo pairs are compared as a matrix."""
+    cards_a, masks_a, weights_a = combos_a
+    cards_b, masks_b, weights_b = combos_b
+    pair_weights = weights_a[:, None] * weights_b[None, :] * ((masks_a[:, None] & masks_b[None, :]) == 0)
+    live_cards = [card for card in range(52) if not dead_mask >> card & 1]
+    totals = np.zeros(3) # weighted wins, ties, total weight
+    for runout in combinations(live_cards, 5 - len(board)):
+        runout_mask = np.uint64(cards_mask(runout))
+        full_board = np.array(list(board) + list(runout), dtype=np.int64)
+        live_a = (masks_a & runout_mask) == 0
+        live_b = (masks_b & runout_mask) == 0
+        if not live_a.any() or not live_b.any(): continue
+        scores_a = evaluator.evaluate_batch(np.concatenate([cards_a[live_a], np.broadcast_to(full_board, (live_a.sum(), 5))], axis=1))
+        scores_b = evaluator.evaluate_batch(np.concatenate([cards_b[live_b], np.broadcast_to(full_board, (live_b.sum(), 5))], axis=1))
+        weights = pair_weights[np.ix_(live_a, live_b)]
+        totals[0] += (weights * (scores_a[:, None] > scores_b[None, :])).sum()
+        totals[1] += (weights * (scores_a[:, None] == scores_b[None, :])).sum()
+        totals[2] += weights.sum()
+    return totals
+
+
+def _sampled_range_equity(evaluator, combos_a, combos_b, board, dead_mask, num_trials, rng):
+    """Random combo pairs (by weight, overlapping pairs rejected) with a random runout each."""
+    cards_a, masks_a, weights_a = combos_a
+    cards_b, masks_b, weights_b = combos_b
+    board_array = np.array(board, dtype=np.int64)
+    totals = np.zeros(3)
+    done = attempts = 0
+    while done < num_trials:
+        size = min(RANGE_CHUNK, 2 * (num_trials - done))
+        picks_a = rng.choice(len(weights_a), size=size, p=weights_a / weights_a.sum())
+        picks_b = rng.choice(len(weights_b), size=size, p=weights_b / weights_b.sum())
+        disjoint = (masks_a[picks_a] & masks_b[picks_b]) == 0
+        picks_a, picks_b = picks_a[disjoint][:num_trials - done], picks_b[disjoint][:num_trials - done]
+        attempts += size
+        if len(picks_a) == 0:
+            if attempts > 100 * RANGE_CHUNK:
+                raise ValueError("The two ranges (almost) never fit together with these known cards")
+            continue
+        row_dead = masks_a[picks_a] | masks_b[picks_b] | np.uint64(dead_mask)
+        runouts = Deck.deal_batch(len(picks_a), 5 - len(board), row_dead, rng)
+        full_boards = np.concatenate([np.broadcast_to(board_array, (len(runouts), len(board))), runouts], axis=1)
+        scores_a = evaluator.evaluate_batch(np.concatenate([cards_a[picks_a], full_boards], axis=1))
+        scores_b = evaluator.evaluate_batch(np.concatenate([cards_b[picks_b], full_boards], axis=1))
+        totals += [(scores_a > scores_b).sum(), (scores_a == scores_b).sum(), len(picks_a)]
+        done += len(picks_a)
+    return totals
+
+
+def range_vs_range_equity(range_a, range_b, board=(), dead_cards=(), num_trials=DEFAULT_RANGE_TRIALS, seed=None, method='auto'):
+    """
+    Equity of range_a against range_b (HandRange objects or range text), heads-up.
+    Combos are weighted by their range weights; combo pairs that share a card, and combos blocked
+    by the board or dead_cards, are left out. method: 'exact' enumerates every runout (fine from
+    the turn, or the flop with narrow ranges), 'monte_carlo' samples num_trials deals, 'auto' picks.
+    Returns {'win', 'tie', 'equity', 'trials', 'method'} for range_a; range_b's equity is 1 - equity.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for range equity.")
+    from Equity import _get_evaluator # Shared per-process batch evaluator
+    if method not in EQUITY_METHODS:
+        raise ValueError(f"Unknown equity method '{method}'. Choose from: {', '.join(EQUITY_METHODS)}")
+    board, dead_cards = _to_cards(board), _to_cards(dead_cards)
+    if len(board) > 5:
+        raise ValueError(f"A board has at most 5 cards, got {len(board)}")
+    dead_mask = cards_mask(list(board) + list(dead_cards))
+    combos_a = _live_combos(_as_range(range_a), dead_mask)
+    combos_b = _live_combos(_as_range(range_b), dead_mask)
+    if not len(combos_a[2]) or not len(combos_b[2]):
+        raise ValueError("A range has no combos left after card removal")
+
+    runouts = comb(52 - bin(dead_mask).count('1'), 5 - len(board))
+    if method == 'auto':
+        small = runouts <= RANGE_EXACT_MAX_RUNOUTS and runouts * len(combos_a[2]) * len(combos_b[2]) <= RANGE_EXACT_MAX_PAIRS
+        method = 'exact' if small else 'monte_carlo'
+    evaluator = _get_evaluator()
+    if method == 'exact':
+        wins, ties, total = _exact_range_equity(evaluator, combos_a, combos_b, board, dead_mask)
+        trials = runouts
+    else:
+        wins, ties, total = _sampled_range_equity(evaluator, combos_a, combos_b, board, dead_mask, num_trials, np.random.default_rng(seed))
+        trials = num_trials
+    if total == 0:
+        raise ValueError("The two ranges never fit together with these known cards")
+    return {'win': float(wins / total), 'tie': float(ties / total), 'equity': float((wins + ties / 2) / total),
+            'trials': trials, 'method': method}
@@ -1,24 +1,47 @@
 import random
+import time
 import traceback
 from Deck import Deck
-from HandEvaluator import HandEvaluator, HandRank # Import HandRank if needed for comparisons/logging
-from BotPlayer import BotPlayer
+from CardEncoding import cards_to_str
+from HandEvaluator import HandEvaluator, HandRank, HandState # Import HandRank if needed for comparisons/logging
+from HandPotential import hand_potential
+from OutsAnalyzer import analyze_outs
+from PlayerStats import StatsTracker
+from Equity import showdown_equity
+from BotPlayer import BotPlayer, HAND_ANALYSIS_DIFFICULTIES
 # Make sure these files exist and contain the necessary classes
 # Define constants
 INITIAL_HEARTS = 5 # Default starting hearts, can be overridden
 HEART_CHIP_EXCHANGE_AMOUNT = 1000 # Amount of chips received for 1 heart
+HOLE_CARDS_PER_VARIANT = {'holdem': 2, 'omaha': 4} # Omaha hands must use exactly 2 hole + 3 board cards
+MAX_RUN_IT_TIMES = 4 # Boards dealt at most when an all-in is run more than once
+HAND_ANALYSIS_MAX_SHARE = 0.5 # Outs are skipped once preparing a bot's decision has used this share of its time budget
 
 class PokerGame:
     """Manages the poker game logic for the GUI."""
 
-    def __init__(self, player_name, bot_count, bot_difficulty, initial_hearts, initial_chips=1000):
-        print(f"DEBUG MM: Initializing PokerGame - P:{player_name}, B:{bot_count}, D:{bot_difficulty}, H:{initial_hearts}, C:{initial_chips}")
+    def __init__(self, player_name, bot_count, bot_difficulty, initial_hearts, initial_chips=1000, game_variant='holdem', run_it_times=1,
+                 defer_all_in_equity=False):
+        print(f"DEBUG MM: Initializing PokerGame - P:{player_name}, B:{bot_count}, D:{bot_difficulty}, H:{initial_hearts}, C:{initial_chips}, V:{game_variant}, R:{run_it_times}")
+        if game_variant not in HOLE_CARDS_PER_VARIANT:
+            raise ValueError(f"Unknown game variant '{game_variant}'. Choose from: {', '.join(HOLE_CARDS_PER_VARIANT)}")
+        if not 1 <= run_it_times <= MAX_RUN_IT_TIMES:
+            raise ValueError(f"run_it_times must be 1..{MAX_RUN_IT_TIMES}, got {run_it_times}")
+        self.game_variant = game_variant
+        self.run_it_times = run_it_times # Boards to deal (each for an equal share of the pot) when all-in before the river
+        self.defer_all_in_equity = defer_all_in_equity # True: the caller runs compute_all_in_equity itself (the GUI, off its Tk thread)
         self.initial_chips = initial_chips
         self.players = {}
         self.bots = []
         self.human_player_name = player_name
         self.deck = Deck()
         self.community_cards = []
+        self.hand_states = {} # name -> HandState (hole cards + board so far), updated as community cards are dealt (Hold'em only)
+        self.all_in_equity = None # name -> {'win', 'tie', 'equity'} of each contestant once all-in with cards to come
+        self._all_in_board_size = None # Community cards out when the all-in happened (where extra runs start)
+        self.all_in_spot = None # (names, hands, board) at the all-in until compute_all_in_equity has run
+        self.action_history = [] # This hand's actions in order: {'stage', 'player', 'action', 'bet' (player's total this street)}
+        self.player_stats = StatsTracker() # VPIP, PFR, aggression, ... per player over the whole match
         self.pot = 0
         self.current_bet = 0
         self.previous_bet = 0 # Tracks the bet level *before* the current_bet (for min raise calc)
@@ -140,6 +163,11 @@ class PokerGame:
             'current_turn_player': current_turn_player, # Name of player whose turn it is
             'small_blind': self.small_blind, # Pass blind info
             'big_blind': self.big_blind,
+            # Equity of each contestant at the moment everyone was all-in (None otherwise)
+            'all_in_equity': {name: result['equity'] for name, result in self.all_in_equity.items()} if self.all_in_equity else None,
+            'run_it_times': self.run_it_times,
+            'action_history': [dict(entry) for entry in self.action_history], # Copies; blinds aren't listed
+            'player_stats': self.player_stats.summary(), # name -> {'hands', 'vpip', 'pfr', 'three_bet', 'aggression', 'fold_to_cbet', 'wtsd', 'wsd'}
         }
 
     def start_new_round_get_info(self):
@@ -189,6 +217,11 @@ class PokerGame:
         # --- Reset Round States ---
         self.deck.reset_and_shuffle()
         self.community_cards = []
+        self.hand_states = {}
+        self.all_in_equity = None
+        self._all_in_board_size = None
+        self.all_in_spot = None
+        self.action_history = []
         self.pot = 0
         self.current_bet = 0
         self.previous_bet = 0 # Reset previous bet level
@@ -219,6 +252,7 @@ class PokerGame:
                  # Store starting values even if inactive (for consistency)
                  player_state['start_round_chips'] = player_state['chips']
                  player_state['start_round_hearts'] = player_state['hearts']
+        self.player_stats.start_hand(active_players_with_chips)
         # --- End Reset Round States ---
 
         # --- Move Dealer Button ---
@@ -281,7 +315,7 @@ class PokerGame:
 
         # --- Deal Hole Cards ---
         try:
-            num_cards_to_deal = 2
+            num_cards_to_deal = HOLE_CARDS_PER_VARIANT[self.game_variant]
             for _ in range(num_cards_to_deal):
                 # Deal one card at a time, starting left of dealer
                 deal_start_offset = (new_dealer_idx_in_active + 1) % num_active
@@ -289,10 +323,14 @@ class PokerGame:
                     player_to_deal_idx = (deal_start_offset + i) % num_active
                     player_name = active_players_with_chips[player_to_deal_idx]
                     card = self.deck.deal_card()
-                    if not card:
+                    if card is None: # Card 0 ('2h') is a valid card, so test for None explicitly
                         raise ValueError("Deck ran out of cards during initial deal!")
                     self.players[player_name]['cards'].append(card)
             print("DEBUG MM: Hole cards dealt.")
+            # Start each player's incremental hand state from their hole cards. Omaha's 2+3 rule can't be
+            # tracked as one growing card set, so get_hand_strength scores those hands directly.
+            if self.game_variant == 'holdem':
+                self.hand_states = {name: HandState(self.players[name]['cards']) for name in active_players_with_chips}
             # Optional: Log player's hand for debug
             # print(f"DEBUG MM: Player {self.human_player_name} cards: {self.players[self.human_player_name]['cards']}")
         except ValueError as e:
@@ -445,6 +483,7 @@ class PokerGame:
 
         amount_to_call = max(0, self.current_bet - player['current_round_bet'])
         player_chips = player['chips']
+        bet_before_action = self.current_bet # To tell raises apart from calls for the player stats
 
         # Increment action count for this player in this betting round
         self._player_action_count_this_betting_round[player_name] = self._player_action_count_this_betting_round.get(player_name, 0) + 1
@@ -596,6 +635,9 @@ class PokerGame:
             # No, only advance if action was successfully processed or was fold/check/call(0).
             # If a raise failed validation, it should remain the player's turn.
             # Let's advance only if action was processed OR if round ended.
+            if processed:
+                self.action_history.append({'stage': self.current_stage, 'player': player_name, 'action': action, 'bet': player['current_round_bet']})
+                self.player_stats.record_action(self.current_stage, player_name, action, amount_to_call, self.current_bet > bet_before_action)
             if processed and not self.round_over:
                 self._advance_turn_index()
             elif self.round_over:
@@ -730,6 +772,7 @@ class PokerGame:
              return None # Cannot advance yet
 
         print(f"DEBUG MM: Advancing stage from {self.current_stage}")
+        self._check_all_in_runout()
 
         next_stage_map = {'pre-flop': 'flop', 'flop': 'turn', 'turn': 'river', 'river': 'showdown'}
         card_deal_map = {'flop': 3, 'turn': 1, 'river': 1} # Cards to deal for each stage
@@ -760,13 +803,15 @@ class PokerGame:
                          dealt_cards = []
                          for _ in range(num_cards_to_deal):
                              card = self.deck.deal_card()
-                             if card:
+                             if card is not None:
                                  self.community_cards.append(card)
                                  dealt_cards.append(card)
+                                 for hand_state in self.hand_states.values():
+                                     hand_state.add_card(card) # O(1) update per player
                              else:
                                  # This should be rare unless deck setup is wrong
                                  raise ValueError(f"Deck empty while dealing {next_stage}!")
-                         print(f"DEBUG MM: Dealt {next_stage.capitalize()}: {dealt_cards} -> Community: {self.community_cards}")
+                         print(f"DEBUG MM: Dealt {next_stage.capitalize()}: {cards_to_str(dealt_cards)} -> Community: {cards_to_str(self.community_cards)}")
                          return next_stage # Return name of stage dealt ('flop', 'turn', 'river')
                      except ValueError as e:
                           print(f"ERROR MM: Failed to deal cards for {next_stage}: {e}")
@@ -786,6 +831,85 @@ class PokerGame:
             print(f"Warning MM: Cannot advance stage from unknown stage: {self.current_stage}")
             return None
 
+    def _check_all_in_runout(self):
+        """Called once betting has closed. If no more betting is possible (every contestant but at most one
+           is all-in) and board cards are still to come, records where the board stood (extra runs start
+           there) and each contestant's equity at that moment, for display and logging."""
+        if self._all_in_board_size is not None or len(self.community_cards) >= 5: return
+        contesting = {name: p for name, p in self.players.items() if not p.get('folded') and p.get('cards')}
+        if len(contesting) < 2 or not any(p.get('all_in') for p in contesting.values()): return
+        if sum(1 for p in contesting.values() if not p.get('all_in')) > 1: return
+
+        self._all_in_board_size = len(self.community_cards)
+        if self.game_variant != 'holdem': return # showdown_equity is Hold'em only
+        self.all_in_spot = (list(contesting), [list(p['cards']) for p in contesting.values()], list(self.community_cards))
+        if not self.defer_all_in_equity:
+            self.compute_all_in_equity()
+
+    def compute_all_in_equity(self):
+        """Fills all_in_equity for the recorded all-in spot and returns it. Only reads that snapshot, so it
+           can run on a worker thread; the result is dropped if a new round has started in the meantime."""
+        spot = self.all_in_spot
+        if spot is None: return self.all_in_equity
+        names, hands, board = spot
+        try:
+            results = showdown_equity(hands, board)
+        except Exception as e:
+            print(f"ERROR MM: All-in equity calculation failed: {e}")
+            return None
+        if self.all_in_spot is not spot: return None # Stale - the round is over
+        self.all_in_equity = {name: {key: result[key] for key in ('win', 'tie', 'equity')} for name, result in zip(names, results)}
+        self.all_in_spot = None
+        summary = ", ".join(f"{name} {result['equity']:.1%}" for name, result in self.all_in_equity.items())
+        print(f"DEBUG MM: All-in with {len(board)} board cards ({results[0]['method']}, {results[0]['trials']:,} runouts): {summary}")
+        return self.all_in_equity
+
+    def _deal_extra_runouts(self):
+        """Run it N times: deals the other N-1 boards from the deck, each sharing the cards that were out at the all-in."""
+        if self.run_it_times < 2 or self._all_in_board_size is None: return []
+        boards = []
+        for _ in range(self.run_it_times - 1):
+            board = list(self.community_cards[:self._all_in_board_size])
+            for _ in range(5 - self._all_in_board_size):
+                card = self.deck.deal_card()
+                if card is None:
+                    print("Warning MM: Deck ran out while dealing extra runouts.")
+                    return boards
+                board.append(card)
+            boards.append(board)
+        return boards
+
+    def _from_button(self, names):
+        """names in seat order starting left of the dealer button (the order odd chips are handed out in)."""
+        seats = list(self.players)
+        start = seats.index(self.dealer_button_player) + 1 if self.dealer_button_player in seats else 0
+        order = seats[start:] + seats[:start]
+        return sorted(names, key=order.index)
+
+    def _award_runouts(self, showdown_hands, boards, first_ranking, pot, winner_info):
+        """Splits the pot evenly across the boards (odd chips to the first runs) and pays each board's winners."""
+        runs = []
+        winners = []
+        distributed_total = 0
+        for i, board in enumerate(boards):
+            run_pot = pot // len(boards) + (1 if i < pot % len(boards) else 0)
+            ranking = first_ranking if i == 0 else self.hand_evaluator.rank_showdown(showdown_hands, board, omaha=self.game_variant == 'omaha')
+            run_winners = self._from_button(ranking[0][1])
+            win_amount_each = run_pot // len(run_winners)
+            for winner_name in run_winners:
+                self.players[winner_name]['chips'] += win_amount_each
+                distributed_total += win_amount_each
+                if winner_name not in winners: winners.append(winner_name)
+            self.players[run_winners[0]]['chips'] += run_pot % len(run_winners) # Odd chips: first winner left of the button
+            distributed_total += run_pot % len(run_winners)
+            hand_type = HandRank.from_score(ranking[0][0]).rank_name
+            runs.append({'board': board, 'winners': run_winners, 'pot': run_pot, 'win_amount': win_amount_each, 'type': hand_type})
+            print(f"DEBUG MM: Run {i + 1}/{len(boards)}: {cards_to_str(board)} -> {run_winners} ({hand_type}), {win_amount_each} each of {run_pot}")
+        winner_info['runs'] = runs
+        winner_info['winners'] = winners
+        winner_info['win_amount'] = 0 # Differs per run, see 'runs'
+        winner_info['distributed_pot'] = distributed_total
+
     def start_next_betting_round(self):
         """Resets betting vars & determines turn order for Flop/Turn/River.
            Called by controller *after* advance_to_next_stage deals cards."""
@@ -916,53 +1040,68 @@ class PokerGame:
                 self.players[winner_name]['chips'] += win_amount
                 print(f"DEBUG MM: {winner_name} wins {win_amount} by default.")
             else:
-                # Showdown logic (remains the same)
-                best_hands = {}
+                # Showdown logic: rank every hand in one pass over the shared board (ties come grouped)
                 evaluated_details = {}
                 print(f"DEBUG MM: Showdown between: {eligible_names}")
-                print(f"DEBUG MM: Community Cards: {self.community_cards}")
+                print(f"DEBUG MM: Community Cards: {cards_to_str(self.community_cards)}")
+                showdown_hands = {}
                 for name, player_state in eligible_players.items():
                     hole_cards = player_state.get('cards', [])
                     if not hole_cards:
                         print(f"Warning MM: Player {name} in showdown has no hole cards?")
                         evaluated_details[name] = {'type': 'Missing Cards', 'hole_cards': []}
                         continue
-                    try:
-                        rank_obj, best_5_card_strings = self.hand_evaluator.evaluate_hand(
-                            hole_cards, self.community_cards
-                        )
-                        if rank_obj is not None:
-                            best_hands[name] = rank_obj
-                            evaluated_details[name] = {
-                                'type': rank_obj.rank_name,
-                                'hand': best_5_card_strings,
-                                'hole_cards': hole_cards
-                            }
-                            print(f"DEBUG MM Eval Result: {name} -> {rank_obj.rank_name} (Kickers: {rank_obj.kickers}), Hand: {best_5_card_strings}, Hole: {hole_cards}")
-                        else:
-                            print(f"ERROR MM: Hand evaluation returned None for {name}")
-                            evaluated_details[name] = {'type': 'Eval Error (None)', 'hole_cards': hole_cards}
-                    except Exception as e:
-                        print(f"ERROR MM: Hand evaluation failed unexpectedly for {name}: {e}")
-                        traceback.print_exc()
+                    showdown_hands[name] = hole_cards
+                try:
+                    ranking = self.hand_evaluator.rank_showdown(showdown_hands, self.community_cards,
+                                                                omaha=self.game_variant == 'omaha')
+                except Exception as e:
+                    print(f"ERROR MM: Hand evaluation failed unexpectedly at showdown: {e}")
+                    traceback.print_exc()
+                    ranking = []
+                    for name, hole_cards in showdown_hands.items():
                         evaluated_details[name] = {'type': 'Eval Exception', 'hole_cards': hole_cards}
+                best_hands = {name: strength for strength, names in ranking for name in names} # name -> int strength
+                winners = list(ranking[0][1]) if ranking else []
+
+                # HandRank and best five are only built here, for the GUI's hand results
+                for name, strength in best_hands.items():
+                    hole_cards = eligible_players[name].get('cards', [])
+                    if self.game_variant == 'omaha':
+                        rank_obj, best_5_cards = self.hand_evaluator.describe_omaha_hand(strength, hole_cards, self.community_cards)
+                    else:
+                        rank_obj, best_5_cards = self.hand_evaluator.describe_hand(strength, list(hole_cards) + list(self.community_cards))
+                    evaluated_details[name] = {
+                        'type': rank_obj.rank_name,
+                        'hand': best_5_cards, # Card ints - the GUI converts them for display
+                        'hole_cards': hole_cards,
+                        'strength': strength
+                    }
+                    print(f"DEBUG MM Eval Result: {name} -> {rank_obj.rank_name} (Kickers: {rank_obj.kickers}), Hand: {cards_to_str(best_5_cards)}, Hole: {cards_to_str(hole_cards)}")
 
                 winner_info['details'] = evaluated_details
+                winner_info['ranking'] = ranking # [(strength, [names])] best first
 
-                if best_hands:
-                    winning_rank_obj = max(best_hands.values())
-                    winners = [name for name, rank_obj in best_hands.items() if rank_obj == winning_rank_obj]
+                extra_boards = self._deal_extra_runouts() if best_hands and winners else []
+                if extra_boards:
+                    print(f"DEBUG MM: Running it {len(extra_boards) + 1} times.")
+                    self._award_runouts(showdown_hands, [list(self.community_cards)] + extra_boards, ranking, main_pot_amount, winner_info)
+                elif best_hands:
                     winner_info['winners'] = winners
                     if winners:
                         num_winners = len(winners)
                         win_amount_each = main_pot_amount // num_winners
                         remainder = main_pot_amount % num_winners
                         distributed_total = 0
-                        print(f"DEBUG MM: Winner(s) ({winning_rank_obj.rank_name}): {winners}. Splitting pot {main_pot_amount} -> {win_amount_each} each.")
-                        if remainder > 0: print(f"DEBUG MM: Remainder of {remainder} chips from split.")
+                        print(f"DEBUG MM: Winner(s) ({evaluated_details[winners[0]]['type']}): {winners}. Splitting pot {main_pot_amount} -> {win_amount_each} each.")
                         for winner_name in winners:
                             self.players[winner_name]['chips'] += win_amount_each
                             distributed_total += win_amount_each
+                        if remainder > 0:
+                            odd_chip_winner = self._from_button(winners)[0]
+                            self.players[odd_chip_winner]['chips'] += remainder
+                            distributed_total += remainder
+                            print(f"DEBUG MM: Remainder of {remainder} chips from split goes to {odd_chip_winner} (first left of the button).")
                         winner_info['win_amount'] = win_amount_each
                         winner_info['distributed_pot'] = distributed_total
                     else:
@@ -972,6 +1111,8 @@ class PokerGame:
                     print("Warning MM: Showdown occurred but no hands were successfully evaluated.")
                     winner_info['distributed_pot'] = 0
 
+            self.player_stats.end_hand(eligible_names if len(eligible_players) > 1 else [], winner_info['winners'], len(self.community_cards))
+
             # --- <<< Heart Deduction Logic (MODIFIED) >>> ---
             human_state = self.players.get(self.human_player_name)
             if human_state:
@@ -1011,9 +1152,48 @@ class PokerGame:
              return winner_info
 
 
-    def get_bot_action_gui(self, bot_name):
+    def get_hand_strength(self, player_name):
+        """Current int strength (see HandEvaluator.hand_strength) of a player's hole cards plus the board.
+           Served from the incremental hand state, so it is cheap to ask every street. None if not dealt in.
+           In Omaha the hand is scored with the 2+3 rule each time it is asked for."""
+        if self.game_variant == 'omaha':
+            hole_cards = self.players.get(player_name, {}).get('cards')
+            return self.hand_evaluator.omaha_strength(hole_cards, self.community_cards) if hole_cards else None
+        hand_state = self.hand_states.get(player_name)
+        return hand_state.strength() if hand_state else None
+
+    def get_hand_potential(self, player_name):
+        """{'hs', 'ppot', 'npot', 'ehs'} (see HandPotential) for a Hold'em player after the flop, against the
+           other players still in. Cached per canonical hand and board, so asking again on the same street is free.
+           None preflop, in Omaha or if the player isn't in the hand."""
+        player_state = self.players.get(player_name)
+        if self.game_variant != 'holdem' or len(self.community_cards) < 3 or not player_state or not player_state.get('cards'):
+            return None
+        opponents = sum(1 for name, p in self.players.items() if name != player_name and p.get('cards') and not p.get('folded'))
+        return hand_potential(player_state['cards'], self.community_cards, max(1, opponents))
+
+    def get_outs(self, player_name):
+        """analyze_outs (see OutsAnalyzer) for a Hold'em player on the flop or turn: outs per draw,
+           the chance of hitting them and the board texture. None on other streets, in Omaha or if not dealt in."""
+        player_state = self.players.get(player_name)
+        if self.game_variant != 'holdem' or len(self.community_cards) not in (3, 4) or not player_state or not player_state.get('cards'):
+            return None
+        return analyze_outs(player_state['cards'], self.community_cards)
+
+    def _bot_analysis(self, analysis, bot_name):
+        """analysis(bot_name), or None if it fails."""
+        try:
+            return analysis(bot_name)
+        except Exception as e:
+            print(f"ERROR MM: {analysis.__name__} failed for {bot_name}: {e}")
+            return None
+
+    def get_bot_action_gui(self, bot_name, time_budget=None):
         """Gets action from the specified bot via its BotPlayer instance.
+           time_budget: seconds the bot may spend thinking (None = bot's own default). Preparing the
+           hand analysis comes out of it; the bot gets whatever is left as game_state['time_budget'].
            Returns (action_string, amount). Amount is TOTAL bet for raise, 0 otherwise."""
+        decision_start = time.perf_counter()
         player_state = self.players.get(bot_name)
         if not player_state or not player_state.get('is_bot'):
             print(f"ERROR MM: get_bot_action called for invalid/non-bot player: {bot_name}")
@@ -1029,7 +1209,18 @@ class PokerGame:
         game_state_for_bot = self.get_game_state_summary()
         # Add bot's own hole cards (not usually in the public summary)
         game_state_for_bot['my_cards'] = player_state.get('cards', [])
-        # Optionally add other info bots might need (e.g., hand history, opponent modeling data)
+        # A failing analysis leaves its field None: the bot loses the analysis, not its turn
+        game_state_for_bot['my_hand_strength'] = self._bot_analysis(self.get_hand_strength, bot_name) # Int strength of hole cards + board so far
+        if time_budget is None:
+            time_budget = bot_player_instance.think_time
+        # Hand analysis costs milliseconds a street, so only bots that read it get it (table bots must stay fast)
+        analyze = bot_player_instance.difficulty in HAND_ANALYSIS_DIFFICULTIES
+        game_state_for_bot['my_hand_potential'] = self._bot_analysis(self.get_hand_potential, bot_name) if analyze else None # HS/PPot/NPot/EHS, cached per street
+        analyze = analyze and time.perf_counter() - decision_start < HAND_ANALYSIS_MAX_SHARE * time_budget
+        game_state_for_bot['my_outs'] = self._bot_analysis(self.get_outs, bot_name) if analyze else None # Outs per draw and board texture, flop and turn only
+        # Seconds the bot may still think (e.g. equity sampling) after the analysis above
+        game_state_for_bot['time_budget'] = max(0.0, time_budget - (time.perf_counter() - decision_start))
+        # Opponent modeling: every player's running stats come with the summary ('player_stats')
 
         try:
             # Call the bot's decision-making method
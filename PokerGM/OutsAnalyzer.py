@@ -0,0 +1,175 @@
+import functools
+from itertools import combinations
+from CardEncoding import CARD_RANK_BIT, RANK_CHARS, card_from_str, cards_mask, make_card, suit_isomorphic_key, suit_isomorphic_order
+from HandEvaluator import HandRank, _score_cards
+
+# Outs and draws for Hold'em hole cards on a flop or turn.
+#  - An out is an unseen card that lifts the hand into a better category (pair -> set, four
+#    to a flush -> flush, ...) and further ahead of what the board alone makes, or at least
+#    as far ahead while pairing a hole card (full house -> quads on a board that pairs too).
+#    A card that only improves the board (e.g. pairs it for everyone) is not an out.
+#  - Each improvement gets its outs and its chance of being hit on the next card and by the
+#    river. By-river chances are counted over every turn/river runout, so runner-runner
+#    draws and outs that overlap between draws are handled exactly.
+#  - Board texture (paired, flush and straight possibilities, ...) depends only on the board up
+#    to a relabeling of suits, so it is precomputed once for all 1,755 canonical flops and read
+#    back with a dict lookup. Turn and river boards are computed on first use and cached.
+#  - Whole analyses are memoized per suit-isomorphic (hole cards, board): a flop analysis walks
+#    ~1,081 runouts, so a bot asking again on the same street (or an equivalent spot) only pays
+#    for the key and for mapping the out cards back to the real suits.
+
+STRAIGHT_WINDOWS = [0b11111 << low for low in range(9)] + [(1 << 12) | 0b1111] # 13-bit rank masks, wheel last
+FLUSH_TEXTURES = {1: 'rainbow', 2: 'two-tone', 3: 'monotone'} # Flop suit patterns by most cards in one suit
+
+_FLOP_TEXTURES = None # suit_isomorphic_key(flop) -> texture dict, for every canonical flop
+_LATER_TEXTURES = {} # Same for turn and river boards, filled as they come up
+OUTS_CACHE_SIZE = 4096 # Suit-isomorphic (hole cards, board) spots kept by analyze_outs
+
+
+def _compute_texture(board):
+    rank_counts = {}
+    suit_counts = [0, 0, 0, 0]
+    for card in board:
+        rank_counts[card >> 2] = rank_counts.get(card >> 2, 0) + 1
+        suit_counts[card & 3] += 1
+    rank_mask = 0
+    for card in board:
+        rank_mask |= CARD_RANK_BIT[card]
+    window_counts = [bin(rank_mask & window).count('1') for window in STRAIGHT_WINDOWS]
+    max_suited = max(suit_counts)
+    cards_to_come = 5 - len(board)
+    return {
+        'paired': max(rank_counts.values()) >= 2,
+        'trips': max(rank_counts.values()) >= 3,
+        'high_card': RANK_CHARS[max(rank_counts)],
+        'max_suited': max_suited, # Most board cards of a single suit
+        'flush_texture': FLUSH_TEXTURES.get(max_suited, 'monotone') if len(board) == 3 else None,
+        'flush_possible': max_suited >= 3, # Two suited hole cards make a flush now
+        'flush_draw_possible': cards_to_come > 0 and max_suited + cards_to_come >= 3 and max_suited >= 2,
+        'straight_possible': max(window_counts) >= 3, # Two hole cards make a straight now
+        'straight_draw_possible': cards_to_come > 0 and max(window_counts) + cards_to_come >= 3 and max(window_counts) >= 2,
+        'straights': sum(1 for count in window_counts if count >= 3), # Distinct straights two hole cards can make now
+    }
+
+
+def _board_category(board):
+    """Hand category the board alone makes. Boards of 3-4 cards (which the evaluator scores as
+       High Card) are categorized by their rank counts: pair, two pair, trips or quads."""
+    if len(board) >= 5:
+        return _score_cards(board) >> 20
+    counts = sorted((sum(1 for card in board if card >> 2 == rank) for rank in set(card >> 2 for card in board)), reverse=True)
+    if counts[0] == 4: return HandRank.FOUR_OF_A_KIND
+    if counts[0] == 3: return HandRank.THREE_OF_A_KIND
+    if counts[0] == 2: return HandRank.TWO_PAIR if len(counts) > 1 and counts[1] == 2 else HandRank.PAIR
+    return HandRank.HIGH_CARD
+
+
+def _get_flop_textures():
+    global _FLOP_TEXTURES
+    if _FLOP_TEXTURES is None:
+        textures = {}
+        for flop in combinations(range(52), 3):
+            key = suit_isomorphic_key(flop)
+            if key not in textures:
+                textures[key] = _compute_texture(flop)
+        _FLOP_TEXTURES = textures
+    return _FLOP_TEXTURES
+
+
+def board_texture(board):
+    """
+    Texture of a 3-5 card board (card ints or 'Ah'-style strings): paired/trips, high card,
+    suit pattern and whether flushes and straights are made or drawing. A lookup for flops.
+    """
+    board = [card_from_str(c) if isinstance(c, str) else c for c in board]
+    if not 3 <= len(board) <= 5 or len(set(board)) != len(board):
+        raise ValueError(f"Need 3-5 distinct board cards, got {len(board)}")
+    key = suit_isomorphic_key(board)
+    if len(board) == 3:
+        return dict(_get_flop_textures()[key]) # A copy: the cached dict is shared by every isomorphic board
+    if key not in _LATER_TEXTURES:
+        _LATER_TEXTURES[key] = _compute_texture(board)
+    return dict(_LATER_TEXTURES[key])
+
+
+def analyze_outs(hole_cards, board):
+    """
+    Outs of two hole cards on a flop or turn (card ints or 'Ah'-style strings).
+    Returns {'hand': current category name, 'outs': number of outs, 'out_cards': the outs,
+    'next_card': chance of improving on the next card, 'by_river': chance of improving by the river,
+    'draws': {category name: {'outs', 'out_cards', 'next_card', 'by_river'}}, 'texture': board_texture(board)}.
+    Per draw, 'by_river' is the chance of ending the river with exactly that improvement, so the
+    draws add up to the overall 'by_river'. A draw listed with 0 outs can only be made runner-runner.
+    """
+    hole_cards = [card_from_str(c) if isinstance(c, str) else c for c in hole_cards]
+    board = [card_from_str(c) if isinstance(c, str) else c for c in board]
+    if len(hole_cards) != 2 or len(board) not in (3, 4):
+        raise ValueError(f"Need 2 hole cards and a 3 or 4 card board, got {len(hole_cards)} and {len(board)}")
+    if len(set(hole_cards + board)) != len(hole_cards + board):
+        raise ValueError("Duplicate cards in hole cards and board")
+
+    key, suit_order = suit_isomorphic_order(hole_cards, board)
+    analysis = _outs_from_key(key)
+    relabel = lambda cards: [card - (card & 3) + suit_order[card & 3] for card in cards]
+    draws = {name: dict(draw, out_cards=sorted(relabel(draw['out_cards']))) for name, draw in analysis['draws'].items()}
+    return dict(analysis, out_cards=sorted(relabel(analysis['out_cards'])), draws=draws, texture=dict(analysis['texture']))
+
+
+@functools.lru_cache(maxsize=OUTS_CACHE_SIZE)
+def _outs_from_key(key):
+    """analyze_outs for the representative of a suit_isomorphic_key(hole, board): entry i's ranks in suit i."""
+    hole_cards = [make_card(rank, suit) for suit, (hole_mask, _) in enumerate(key) for rank in range(2, 15) if hole_mask >> (rank - 2) & 1]
+    board = [make_card(rank, suit) for suit, (_, board_mask) in enumerate(key) for rank in range(2, 15) if board_mask >> (rank - 2) & 1]
+    current = _score_cards(hole_cards + board) >> 20
+    current_lead = current - _board_category(board) # Categories the hole cards add to the board
+    hole_ranks = {card >> 2 for card in hole_cards}
+    dead_mask = cards_mask(hole_cards + board)
+    unseen = [card for card in range(52) if not dead_mask >> card & 1]
+
+    def improvement(extra):
+        """Category reached with the extra cards, or None if the hole cards didn't improve."""
+        category = _score_cards(hole_cards + board + extra) >> 20
+        if category <= current:
+            return None
+        lead = category - _board_category(board + extra)
+        if lead > current_lead or (lead == current_lead > 0 and any(card >> 2 in hole_ranks for card in extra)):
+            return category
+        return None
+
+    next_card_outs = {}
+    for card in unseen:
+        category = improvement([card])
+        if category is not None:
+            next_card_outs.setdefault(category, []).append(card)
+
+    if len(board) == 3:
+        runouts = list(combinations(unseen, 2))
+        river_hits = {}
+        for runout in runouts:
+            category = improvement(list(runout))
+            if category is not None:
+                river_hits[category] = river_hits.get(category, 0) + 1
+        river_total = len(runouts)
+    else:
+        river_hits = {category: len(cards) for category, cards in next_card_outs.items()}
+        river_total = len(unseen)
+
+    draws = {}
+    for category in sorted(set(next_card_outs) | set(river_hits), reverse=True):
+        cards = next_card_outs.get(category, [])
+        draws[HandRank.RANK_NAMES[category]] = {
+            'outs': len(cards), 'out_cards': cards,
+            'next_card': len(cards) / len(unseen), 'by_river': river_hits.get(category, 0) / river_total,
+        }
+    out_cards = sorted(card for cards in next_card_outs.values() for card in cards)
+    return {
+        'hand': HandRank.RANK_NAMES[current],
+        'outs': len(out_cards), 'out_cards': out_cards,
+        'next_card': len(out_cards) / len(unseen), 'by_river': sum(river_hits.values()) / river_total,
+        'draws': draws, 'texture': board_texture(board),
+    }
+
+
+def outs_cache_info():
+    """Hits, misses and size of the analyze_outs cache."""
+    return _outs_from_key.cache_info()
@@ -0,0 +1,124 @@
+# Opponent-modeling statistics for every seat, kept as running counters.
+#  - Each action updates a few integers as PokerGame processes it. A player's stats are a fixed
+#    set of counters, so memory doesn't grow with the match and reading them never rescans the
+#    hand history.
+#  - The per-hand bookkeeping (preflop raises so far, the preflop aggressor, whether a c-bet is
+#    being faced, who already counted for VPIP/PFR/3-bet this hand) is reset by start_hand.
+#  - Stats (None until a player has had the chance):
+#      vpip          hands the player put money in preflop voluntarily (calls or raises, not blinds)
+#      pfr           hands the player raised preflop
+#      three_bet     re-raises when facing exactly one preflop raise, per such spot
+#      aggression    postflop bets and raises per call (aggression factor)
+#      fold_to_cbet  folds when facing the preflop aggressor's first flop bet, per such spot
+#      wtsd          showdowns per flop seen
+#      wsd           showdowns won (or split) per showdown
+
+PREFLOP_STAGE = 'pre-flop'
+FLOP_STAGE = 'flop'
+
+
+class PlayerStats:
+    """Running counters for one player."""
+    __slots__ = ('hands', 'vpip', 'pfr', 'three_bet', 'three_bet_chances', 'aggressive', 'calls',
+                 'cbets_faced', 'cbets_folded', 'flops_seen', 'showdowns', 'showdowns_won')
+
+    def __init__(self):
+        for counter in self.__slots__:
+            setattr(self, counter, 0)
+
+    def rates(self):
+        """The stats as {'hands', 'vpip', 'pfr', 'three_bet', 'aggression', 'fold_to_cbet', 'wtsd', 'wsd'}."""
+        return {
+            'hands': self.hands,
+            'vpip': self.vpip / self.hands if self.hands else None,
+            'pfr': self.pfr / self.hands if self.hands else None,
+            'three_bet': self.three_bet / self.three_bet_chances if self.three_bet_chances else None,
+            'aggression': self.aggressive / self.calls if self.calls else None,
+            'fold_to_cbet': self.cbets_folded / self.cbets_faced if self.cbets_faced else None,
+            'wtsd': self.showdowns / self.flops_seen if self.flops_seen else None,
+            'wsd': self.showdowns_won / self.showdowns if self.showdowns else None,
+        }
+
+
+class StatsTracker:
+    """PlayerStats for every seat, updated hand by hand from PokerGame's actions."""
+
+    def __init__(self):
+        self.players = {} # name -> PlayerStats, for the whole match
+        self._in_hand = set() # Players dealt into the current hand
+        self._folded_preflop = set()
+        self._vpip = set() # Players already counted for VPIP/PFR/3-bet this hand
+        self._pfr = set()
+        self._three_bet_chances = set()
+        self._preflop_raises = 0
+        self._preflop_aggressor = None # Last preflop raiser
+        self._flop_bet_made = False
+        self._cbet_pending = False # The first flop bet was a c-bet and nobody has raised it yet
+        self._cbet_faced = set()
+
+    def start_hand(self, names):
+        """Counts a hand for each player dealt in and resets the per-hand bookkeeping."""
+        self._in_hand = set(names)
+        for name in names:
+            self.players.setdefault(name, PlayerStats()).hands += 1
+        for seen in (self._folded_preflop, self._vpip, self._pfr, self._three_bet_chances, self._cbet_faced):
+            seen.clear()
+        self._preflop_raises = 0
+        self._preflop_aggressor = None
+        self._flop_bet_made = False
+        self._cbet_pending = False
+
+    def record_action(self, stage, name, action, amount_to_call, raised):
+        """Updates name's counters for an action taken facing amount_to_call; raised if it raised the bet."""
+        stats = self.players.get(name)
+        if stats is None or name not in self._in_hand:
+            return
+        calling = not raised and amount_to_call > 0 and action in ("call", "all in")
+        if stage == PREFLOP_STAGE:
+            if action == "fold":
+                self._folded_preflop.add(name)
+            if (raised or calling) and name not in self._vpip:
+                self._vpip.add(name)
+                stats.vpip += 1
+            if self._preflop_raises == 1 and name != self._preflop_aggressor and name not in self._three_bet_chances:
+                self._three_bet_chances.add(name)
+                stats.three_bet_chances += 1
+                if raised:
+                    stats.three_bet += 1
+            if raised:
+                if name not in self._pfr:
+                    self._pfr.add(name)
+                    stats.pfr += 1
+                self._preflop_raises += 1
+                self._preflop_aggressor = name
+            return
+
+        if raised:
+            stats.aggressive += 1
+        elif calling:
+            stats.calls += 1
+        if stage != FLOP_STAGE:
+            return
+        if self._cbet_pending and amount_to_call > 0 and name not in self._cbet_faced:
+            self._cbet_faced.add(name)
+            stats.cbets_faced += 1
+            if action == "fold":
+                stats.cbets_folded += 1
+        if raised:
+            self._cbet_pending = not self._flop_bet_made and name == self._preflop_aggressor
+            self._flop_bet_made = True
+
+    def end_hand(self, showdown_players, winners, board_size):
+        """Counts flops seen, showdowns (showdown_players, empty if everyone else folded) and showdowns won."""
+        if board_size >= 3:
+            for name in self._in_hand - self._folded_preflop:
+                self.players[name].flops_seen += 1
+        for name in showdown_players:
+            if name in self.players:
+                self.players[name].showdowns += 1
+                if name in winners:
+                    self.players[name].showdowns_won += 1
+
+    def summary(self):
+        """{name: PlayerStats.rates()} for every player seen this match."""
+        return {name: stats.rates() for name, stats in self.players.items()}
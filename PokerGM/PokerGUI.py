@@ -4,12 +4,16 @@ import time
 import random
 import os
 import traceback # Import traceback for detailed error printing
+import threading
+import queue
 from PIL import Image, ImageTk
 import tkinter.messagebox
-from MatchManager_GUI import PokerGame, INITIAL_HEARTS, HEART_CHIP_EXCHANGE_AMOUNT
+from MatchManager_GUI import PokerGame, INITIAL_HEARTS, HEART_CHIP_EXCHANGE_AMOUNT, MAX_RUN_IT_TIMES
 from BotPlayer import BotPlayer
 from HandEvaluator import HandEvaluator # HandRank not directly used in GUI, but good to have evaluator
 from Deck import Deck
+from CardEncoding import card_from_str, cards_to_str
+from Equity import estimate_equity
 # --- Attempt to import Pillow (PIL) ---
 
 class PokerGUI:
@@ -25,6 +29,10 @@ class PokerGUI:
     SEQ_COLOR_MAN = "#AAAAFF" # Example color
     SEQ_COLOR_DEFAULT = "#FFFFFF"
     STARTING_CHIPS = 1000 # Default starting chips
+    BOT_DECISION_DELAY_MS = 50 # Lets the UI redraw before a bot starts thinking
+    BOT_ACTION_POLL_MS = 20 # How often the Tk thread checks for a bot decision made on a worker thread
+    EQUITY_HUD_TIME_BUDGET = 0.5 # Seconds of sampling per equity HUD update
+    EQUITY_HUD_POLL_MS = 50 # How often the Tk thread checks for finished HUD estimates
 
     # MODIFIED __init__ to accept callback
     def __init__(self, root, on_close_callback=None): # Add callback parameter, default to None
@@ -62,6 +70,15 @@ class PokerGUI:
         self.bot_count = 1 # Default bot count
         self.bot_difficulty = "easy" # Default bot difficulty
         self.human_action_taken = False # Flag to prevent duplicate actions on clicks
+        self.show_equity_hud = False # Optional equity / pot odds panel for the human player
+        self.run_it_times = 1 # Boards dealt when everyone is all-in before the river
+        self._all_in_equity_logged = False # All-in equity is logged once per round
+        self._equity_hud_results = queue.Queue() # (spot key, result) posted by HUD worker threads
+        self._equity_hud_key = None # Spot (hole cards, board, opponents) the HUD currently shows
+        self._equity_hud_in_flight = 0 # Worker threads whose result hasn't been collected yet
+        self._bot_action_results = queue.Queue() # (game, bot name, decision) posted by bot worker threads
+        self._all_in_equity_results = queue.Queue() # (game, all-in equity) posted by the all-in equity worker
+        self._all_in_equity_spot = None # All-in spot whose equity is being computed off the Tk thread
 
         # --- UI Frames ---
         # Setup Frame (for initial options)
@@ -169,16 +186,16 @@ class PokerGUI:
                 try:
                     img = Image.open(file_path)
                     img = img.resize((self.CARD_WIDTH, self.CARD_HEIGHT), Image.Resampling.LANCZOS) # High-quality resize
-                    self.card_images[card_shorthand] = ImageTk.PhotoImage(img)
+                    self.card_images[card_from_str(card_shorthand)] = ImageTk.PhotoImage(img) # Keyed by card int
                     loaded_count += 1
                 except FileNotFoundError:
                     print(f"Warning: Image file not found: {file_path}")
                     if filename not in missing_files: missing_files.append(filename)
-                    self.card_images[card_shorthand] = None # Store None placeholder
+                    self.card_images[card_from_str(card_shorthand)] = None # Store None placeholder
                 except Exception as e:
                     print(f"Warning: Failed to load/resize image {file_path}: {e}")
                     if filename not in missing_files: missing_files.append(filename)
-                    self.card_images[card_shorthand] = None
+                    self.card_images[card_from_str(card_shorthand)] = None
 
         # Load card back
         card_back_path = os.path.join(self.image_dir, "card_back.jpg")
@@ -239,8 +256,23 @@ class PokerGUI:
         difficulty_frame = ttk.Frame(options_frame, style="Setup.TFrame")
         ttk.Radiobutton(difficulty_frame, text="Easy", variable=self.bot_difficulty_var, value="easy").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(difficulty_frame, text="Hard", variable=self.bot_difficulty_var, value="hard").pack(side=tk.LEFT, padx=5) # Add "Hard" option if implemented
+        ttk.Radiobutton(difficulty_frame, text="CFR", variable=self.bot_difficulty_var, value="cfr").pack(side=tk.LEFT, padx=5) # Trained heads-up strategy (CFRTrainer.py)
+        ttk.Radiobutton(difficulty_frame, text="Policy", variable=self.bot_difficulty_var, value="policy").pack(side=tk.LEFT, padx=5) # Exported strategy table (PolicyTable.py)
         difficulty_frame.grid(row=2, column=1, padx=10, pady=10, sticky="w")
 
+        # Equity HUD Toggle
+        ttk.Label(options_frame, text="Equity HUD:", style="Setup.TLabel").grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        self.show_equity_hud_var = tk.BooleanVar(value=self.show_equity_hud)
+        ttk.Checkbutton(options_frame, text="Show my equity and pot odds", variable=self.show_equity_hud_var).grid(row=3, column=1, padx=10, pady=10, sticky="w")
+
+        # Run It N Times Selection (all-in before the river)
+        ttk.Label(options_frame, text="Run All-Ins:", style="Setup.TLabel").grid(row=4, column=0, padx=10, pady=10, sticky="e")
+        self.run_it_times_var = tk.IntVar(value=self.run_it_times)
+        run_it_frame = ttk.Frame(options_frame, style="Setup.TFrame")
+        for i in range(1, MAX_RUN_IT_TIMES + 1):
+             ttk.Radiobutton(run_it_frame, text=f"{i}x", variable=self.run_it_times_var, value=i).pack(side=tk.LEFT, padx=5)
+        run_it_frame.grid(row=4, column=1, padx=10, pady=10, sticky="w")
+
         # Start Game Button
         self.start_button = ttk.Button(self.setup_frame, text="Make the Deal", command=self.start_game, style="Action.TButton", width=20)
         self.start_button.grid(row=2, column=1, pady=(40, 20))
@@ -302,6 +334,9 @@ class PokerGUI:
         self.player_hearts_label = ttk.Label(player_stats_frame, text=f"Hearts: {self.HEART_ICON * INITIAL_HEARTS}",
                                              style="Hearts.TLabel")
         self.player_hearts_label.pack(anchor="w", pady=2)
+        # Equity HUD labels (packed in start_game only if the HUD is switched on)
+        self.equity_hud_label = ttk.Label(player_stats_frame, text="Equity: -", style="GreenBG.TLabel")
+        self.pot_odds_label = ttk.Label(player_stats_frame, text="Pot Odds: -", style="GreenBG.TLabel")
 
         # Player Cards (Center of Player Area)
         cards_frame = ttk.Frame(player_frame, style="Game.TFrame")
@@ -401,6 +436,8 @@ class PokerGUI:
         self.player_name = self.name_entry.get().strip() or "Player" # Get name, default if empty
         self.bot_count = self.bot_count_var.get()
         self.bot_difficulty = self.bot_difficulty_var.get()
+        self.show_equity_hud = self.show_equity_hud_var.get()
+        self.run_it_times = self.run_it_times_var.get()
 
         # Validate bot count (should be between 1 and 3 based on setup)
         if not (1 <= self.bot_count <= 3):
@@ -415,7 +452,9 @@ class PokerGUI:
                 bot_count=self.bot_count,
                 bot_difficulty=self.bot_difficulty,
                 initial_hearts=INITIAL_HEARTS,
-                initial_chips=self.STARTING_CHIPS
+                initial_chips=self.STARTING_CHIPS,
+                run_it_times=self.run_it_times,
+                defer_all_in_equity=True # Computed by _start_all_in_equity, off the Tk thread
             )
         except NameError as e:
              messagebox.showerror("Setup Error", f"A required name is not defined (check imports/constants): {e}")
@@ -430,6 +469,10 @@ class PokerGUI:
         # --- Configure Bot Displays based on actual game setup ---
         self._configure_bot_displays() # Place bot widgets correctly
 
+        if self.show_equity_hud:
+            self.equity_hud_label.pack(anchor="w", pady=2)
+            self.pot_odds_label.pack(anchor="w", pady=2)
+
         # --- Switch from Setup View to Game View ---
         self.setup_frame.pack_forget() # Hide setup widgets
         self.game_frame.pack(fill=tk.BOTH, expand=True) # Show game widgets
@@ -488,6 +531,7 @@ class PokerGUI:
             print("ERROR: start_new_round called but game logic is not initialized.")
             return
 
+        self._all_in_equity_logged = False
         # Check game over status *before* trying to start (catches bust/heart loss from previous round)
         is_over, _, reason = self.game.check_game_over_status()
         if is_over:
@@ -598,9 +642,9 @@ class PokerGUI:
                 img = self.card_back_image # Default to back
                 card_code = None
                 if i < len(community_cards_data):
-                    card_code = community_cards_data[i] # Get card code like 'As' or 'Td'
+                    card_code = community_cards_data[i] # Card int (see CardEncoding)
 
-                if card_code: # If there is a card for this position
+                if card_code is not None: # If there is a card for this position (card 0 is valid)
                      img = self.card_images.get(card_code) # Get loaded image
                 # Use back image if card_code was None, use loaded image if found, else use blank
                 final_img = self.card_back_image if card_code is None else (img if img else img_blank)
@@ -611,10 +655,12 @@ class PokerGUI:
 
             # --- Update Player Area ---
             player_state_data = state['players'].get(self.player_name)
+            all_in_equity = state.get('all_in_equity') or {} # Frozen at the moment of the all-in
             if player_state_data:
                 status_text = ""
                 if player_state_data.get('folded'): status_text = " (Folded)"
                 if player_state_data.get('all_in'): status_text = " (ALL IN)"
+                if self.player_name in all_in_equity: status_text += f" - {all_in_equity[self.player_name]:.0%} equity"
                 self.player_chips_label.config(text=f"Chips: {player_state_data.get('chips', 0)}{status_text}")
                 hearts = player_state_data.get('hearts', 0)
                 self.player_hearts_label.config(text=f"Hearts: {self.HEART_ICON * hearts}")
@@ -622,7 +668,7 @@ class PokerGUI:
                 player_cards_data = player_state_data.get('cards', [])
                 for i, lbl in enumerate(self.player_card_labels):
                     img = img_blank # Default to blank
-                    if i < len(player_cards_data) and player_cards_data[i]:
+                    if i < len(player_cards_data) and player_cards_data[i] is not None:
                         loaded_img = self.card_images.get(player_cards_data[i])
                         if loaded_img: img = loaded_img
                     # Ensure img is valid
@@ -631,6 +677,8 @@ class PokerGUI:
                     lbl.image = img
             else:
                  self.player_chips_label.config(text="Chips: -"); self.player_hearts_label.config(text="Hearts: -")
+            if self.show_equity_hud:
+                self._update_equity_hud(state)
 
             # --- Update Bot Areas ---
             bot_names_in_game = [name for name, p_data in state['players'].items() if p_data.get('is_bot')]
@@ -647,6 +695,7 @@ class PokerGUI:
                             status_text = "Active"
                             if bot_state_data.get('folded'): status_text = "Folded"
                             if bot_state_data.get('all_in'): status_text = "ALL IN"
+                            if actual_bot_name in all_in_equity: status_text += f" ({all_in_equity[actual_bot_name]:.0%})"
                             widgets['info_label'].config(text=f"Chips: {bot_state_data.get('chips', 0)}")
                             widgets['status_label'].config(text=f"Status: {status_text}")
                             # Update bot cards (show back unless specified)
@@ -654,7 +703,7 @@ class PokerGUI:
                             for j, lbl in enumerate(widgets['card_labels']):
                                  img = self.card_back_image # Default to back
                                  # Show face card if showdown or explicitly requested
-                                 if j < len(bot_cards_data) and bot_cards_data[j] and \
+                                 if j < len(bot_cards_data) and bot_cards_data[j] is not None and \
                                     (show_bot_cards or current_stage_name == "showdown"):
                                      loaded_img = self.card_images.get(bot_cards_data[j])
                                      if loaded_img: img = loaded_img # Use loaded image if found
@@ -695,6 +744,65 @@ class PokerGUI:
             traceback.print_exc()
 
 
+    def _update_equity_hud(self, state):
+        """Refreshes the pot odds label and, when the hand, board or number of opponents changed,
+           starts an equity estimate on a worker thread. Never waits for the estimate."""
+        player_state = state['players'].get(self.player_name)
+        pot = state.get('pot', 0)
+        amount_to_call = max(0, state.get('current_bet', 0) - player_state.get('current_round_bet', 0)) if player_state else 0
+        if amount_to_call > 0:
+            self.pot_odds_label.config(text=f"Pot Odds: {amount_to_call / (pot + amount_to_call):.0%} (call {amount_to_call} to win {pot})")
+        else:
+            self.pot_odds_label.config(text="Pot Odds: -")
+
+        opponents = [name for name, p_data in state['players'].items()
+                     if name != self.player_name and p_data.get('cards') and not p_data.get('folded')]
+        if not player_state or player_state.get('folded') or len(player_state.get('cards', [])) != 2 or not opponents \
+           or self.game.game_variant != 'holdem' or state.get('current_stage') == "showdown":
+            self._equity_hud_key = None
+            self.equity_hud_label.config(text="Equity: -")
+            return
+        spot = (tuple(player_state['cards']), tuple(state.get('community_cards', [])), len(opponents))
+        if spot == self._equity_hud_key: return # Already shown or being computed
+        self._equity_hud_key = spot
+        self.equity_hud_label.config(text="Equity: ...")
+        self._equity_hud_in_flight += 1
+        threading.Thread(target=self._equity_hud_worker, args=(spot,), daemon=True).start()
+        if self._equity_hud_in_flight == 1: # Start polling unless a poll loop is already running
+            self.root.after(self.EQUITY_HUD_POLL_MS, self._poll_equity_hud)
+
+    def _equity_hud_worker(self, spot):
+        """Runs on a worker thread: computes the estimate and queues it. Must not touch any widget."""
+        hole_cards, board, num_opponents = spot
+        try:
+            result = estimate_equity(list(hole_cards), list(board), num_opponents,
+                                     time_budget=self.EQUITY_HUD_TIME_BUDGET, target_stderr=0.005)
+        except Exception as e:
+            result = e
+        self._equity_hud_results.put((spot, result))
+
+    def _poll_equity_hud(self):
+        """Tk thread: shows finished estimates for the current spot (stale ones are dropped)."""
+        try:
+            while True:
+                spot, result = self._equity_hud_results.get_nowait()
+                self._equity_hud_in_flight -= 1
+                if spot != self._equity_hud_key or not self.equity_hud_label.winfo_exists(): continue
+                if isinstance(result, Exception):
+                    print(f"Error estimating equity for the HUD: {result}")
+                    self.equity_hud_label.config(text="Equity: error")
+                else:
+                    margin = (result['ci_high'] - result['ci_low']) / 2 # 0 when the spot was enumerated exactly
+                    self.equity_hud_label.config(text=f"Equity: {result['equity']:.0%}" + (f" (\u00b1{margin:.1%})" if margin else ""))
+        except queue.Empty:
+            pass
+        except tk.TclError as e:
+            print(f"TclError updating equity HUD (likely closing window): {e}")
+            return
+        if self._equity_hud_in_flight > 0:
+            self.root.after(self.EQUITY_HUD_POLL_MS, self._poll_equity_hud)
+
+
     def update_action_buttons(self):
         """Enables/disables specific action buttons based on current game state and player chips."""
         if not self.game: return
@@ -981,11 +1089,44 @@ class PokerGUI:
              self.update_ui() # Update UI to show it's bot's turn
              self.root.update() # Force redraw before bot "thinks"
              think_time = random.randint(400, 1200) # Shorter delay maybe
-             self.root.after(think_time, self.get_bot_action, current_player_name)
+             # The bot decides right away and may use the think time for its calculations;
+             # whatever is left of it is waited out before the action is shown
+             self.root.after(self.BOT_DECISION_DELAY_MS, self.get_bot_action, current_player_name, think_time - self.BOT_DECISION_DELAY_MS)
 
 
-    def get_bot_action(self, bot_name):
-        """Gets and processes the specified bot's action from the game logic."""
+    def _bot_action_worker(self, game, bot_name, time_budget):
+        """Runs on a worker thread: asks the game for the bot's decision and queues it. Must not touch any widget."""
+        try:
+            result = game.get_bot_action_gui(bot_name, time_budget=time_budget)
+        except Exception as e:
+            result = e
+        self._bot_action_results.put((game, bot_name, result))
+
+    def _poll_bot_action(self, game, bot_name, think_time, decide_start):
+        """Tk thread: once the bot's worker has decided, waits out the rest of the think time and plays the action.
+           Decisions for a game that has since been replaced are dropped."""
+        if game is not self.game: return
+        while True:
+            try:
+                result_game, result_bot, result = self._bot_action_results.get_nowait()
+            except queue.Empty:
+                self.root.after(self.BOT_ACTION_POLL_MS, self._poll_bot_action, game, bot_name, think_time, decide_start)
+                return
+            if result_game is game and result_bot == bot_name: break
+        if isinstance(result, Exception): # get_bot_action reports it and folds the bot
+            self.get_bot_action(bot_name, 0, result)
+            return
+        remaining_ms = think_time - int((time.perf_counter() - decide_start) * 1000)
+        if remaining_ms > 0:
+            self.root.after(remaining_ms, self.get_bot_action, bot_name, 0, result)
+        else:
+            self.get_bot_action(bot_name, 0, result)
+
+    def get_bot_action(self, bot_name, think_time=0, decided_action=None):
+        """Gets and processes the specified bot's action from the game logic.
+           think_time (ms) is the bot's time budget; decided_action is set when the action was
+           already decided and only the rest of the think time was being waited out (or is the
+           exception the decision raised, in which case the bot folds)."""
         if not self.game or self.game.round_over or self.game.game_over:
             print(f"DEBUG GUI: get_bot_action for {bot_name} skipped, round/game over.")
             return
@@ -1001,7 +1142,13 @@ class PokerGUI:
         # --- Get and Process Bot Action ---
         try:
             # Call backend method to get bot's decision
-            action, total_bet_amount = self.game.get_bot_action_gui(bot_name)
+            if decided_action is None:
+                # The decision (equity sampling, hand analysis) runs on a worker thread so the window stays responsive
+                threading.Thread(target=self._bot_action_worker, args=(self.game, bot_name, think_time / 1000), daemon=True).start()
+                self.root.after(self.BOT_ACTION_POLL_MS, self._poll_bot_action, self.game, bot_name, think_time, time.perf_counter())
+                return
+            if isinstance(decided_action, Exception): raise decided_action # The worker failed to decide
+            action, total_bet_amount = decided_action
 
             # Get bot's state for logging calculations
             player_state = self.game.players.get(bot_name)
@@ -1097,6 +1244,8 @@ class PokerGUI:
          except AttributeError: messagebox.showerror("Game Error", "Game logic missing 'advance_to_next_stage'."); self.check_game_over(); return
          except Exception as e: messagebox.showerror("Stage Error", f"Error advancing game stage logic: {e}"); traceback.print_exc(); self.check_game_over(); return
 
+         self._start_all_in_equity()
+
          # --- Process the Result ---
          if next_stage == "showdown":
              self.add_log_message("\n--- Dealing Showdown ---")
@@ -1143,6 +1292,51 @@ class PokerGUI:
               else: print("ERROR GUI: Game object missing after failed stage advance.")
 
 
+    def _start_all_in_equity(self):
+        """Once everyone is all-in, computes each contestant's equity on a worker thread, like the equity HUD."""
+        if not self.game or self.game.all_in_spot is None or self.game.all_in_spot is self._all_in_equity_spot: return
+        self._all_in_equity_spot = self.game.all_in_spot
+        threading.Thread(target=self._all_in_equity_worker, args=(self.game,), daemon=True).start()
+        self.root.after(self.EQUITY_HUD_POLL_MS, self._poll_all_in_equity, self.game)
+
+    def _all_in_equity_worker(self, game):
+        """Runs on a worker thread: computes the all-in equity and queues it. Must not touch any widget."""
+        try:
+            result = game.compute_all_in_equity()
+        except Exception as e:
+            result = e
+        self._all_in_equity_results.put((game, result))
+
+    def _poll_all_in_equity(self, game):
+        """Tk thread: logs and shows the all-in equity once the worker is done (results for a replaced game are dropped)."""
+        if game is not self.game: return
+        while True:
+            try:
+                result_game, result = self._all_in_equity_results.get_nowait()
+            except queue.Empty:
+                self.root.after(self.EQUITY_HUD_POLL_MS, self._poll_all_in_equity, game)
+                return
+            if result_game is game: break
+        if isinstance(result, Exception):
+            print(f"Error computing all-in equity: {result}")
+            return
+        if not result: return # The round moved on before the equity was ready
+        try:
+            self._log_all_in_equity()
+            self.update_ui(show_bot_cards=game.round_over)
+        except tk.TclError as e:
+            print(f"TclError showing all-in equity (likely closing window): {e}")
+
+    def _log_all_in_equity(self):
+        """Logs each contestant's equity once per round, as soon as the backend has it (everyone all-in)."""
+        if self._all_in_equity_logged or not self.game or not self.game.all_in_equity: return
+        self._all_in_equity_logged = True
+        shares = " | ".join(f"{name} {result['equity']:.1%}" for name, result in self.game.all_in_equity.items())
+        self.add_log_message(f"All-in equity: {shares}")
+        if self.game.run_it_times > 1 and len(self.game.community_cards) < 5:
+            self.add_log_message(f"(Running it {self.game.run_it_times} times)")
+
+
     def determine_winner_and_proceed(self):
         """Calls backend to determine winner, displays info, and checks game over."""
         print("DEBUG GUI: determine_winner_and_proceed called.")
@@ -1188,10 +1382,10 @@ class PokerGUI:
                          player_state = player_states.get(name) # Get updated state
                          if detail and player_state:
                               hole_cards = detail.get('hole_cards', player_state.get('cards', []))
-                              hole_cards_str = " ".join(hole_cards) if hole_cards else "?? ??"
+                              hole_cards_str = " ".join(cards_to_str(hole_cards)) if hole_cards else "?? ??"
                               hand_type = detail.get('type', 'N/A')
                               best_5_cards = detail.get('hand', [])
-                              best_5_str = " ".join(best_5_cards) if best_5_cards else ""
+                              best_5_str = " ".join(cards_to_str(best_5_cards)) if best_5_cards else ""
                               log_line = f"  {name}: "
                               if player_state.get('folded'): log_line += f"Folded ({hole_cards_str})"
                               elif hand_type == 'Default (Others Folded)': log_line += f"Wins by default ({hole_cards_str})"
@@ -1204,12 +1398,19 @@ class PokerGUI:
                 for name, detail in details.items():
                      if name not in displayed_players:
                          status = detail.get('type', 'Unknown')
-                         hole_str = " ".join(detail.get('hole_cards',[]))
+                         hole_str = " ".join(cards_to_str(detail.get('hole_cards',[])))
                          self.add_log_message(f"  (Other) {name}: ({hole_str}) - {status}")
             except Exception as e: print(f"Error logging hand details: {e}")
 
         # --- Log Winner Message ---
-        if len(winners) == 1:
+        runs = winner_info.get('runs')
+        if runs: # Run it N times: one line per board
+            for i, run in enumerate(runs):
+                run_winners = run.get('winners', [])
+                board_str = " ".join(cards_to_str(run.get('board', [])))
+                each = f" ({run.get('win_amount', 0)} each)" if len(run_winners) > 1 else ""
+                self.add_log_message(f"---> Run {i + 1} [{board_str}]: {', '.join(run_winners)} win{'s' if len(run_winners) == 1 else ''} {run.get('pot', 0)}{each} with {run.get('type', '?')}")
+        elif len(winners) == 1:
              self.add_log_message(f"\n---> {winners[0]} wins the pot of {distributed_pot}!")
         elif len(winners) > 1:
              win_amount = winner_info.get('win_amount', 0)
@@ -0,0 +1,127 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+import CFRTrainer
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed to export a policy, not to play from one
+    np = None
+
+# Heads-up policy table: the average strategy of a CFR run (see CFRTrainer) exported once into a
+# compact file that bots play from through a memory map.
+#  - One row of NUM_ACTIONS bytes per information set (betting node x card bucket, in the
+#    trainer's row order): each action's probability in 1/255ths, adding up to 255.
+#  - The header records the stack classes, raise cap and card abstraction, so the betting tree
+#    is rebuilt to match and the file is all a bot needs.
+#  - A decision walks the tree along the hand's action history (a few list lookups, bounded by
+#    the raise cap), looks up the card bucket (O(1) with the 'buckets' abstraction, see
+#    CardAbstraction) and reads one row: microseconds, with no NumPy and no equity sampling.
+# Export (NumPy needed): python PolicyTable.py [--strategy DIR] [--output FILE]
+
+POLICY_FILE_VERSION = 1
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"policy_heads_up_v{POLICY_FILE_VERSION}.bin")
+_POLICY_MAGIC = b"PGPT"
+_POLICY_HEADER = struct.Struct("<4sIIIII16s") # magic, version, information sets, max raises, postflop buckets, stack classes, abstraction
+_STACK_CLASS = struct.Struct("<I") # Each stack class (big blinds) follows the header
+_PROBABILITY_SCALE = 255
+
+_POLICIES = {} # Path -> PolicyTable (or None if there is no usable file), for the bots
+
+
+def export_policy(strategy_directory=CFRTrainer.CFR_DIR, path=POLICY_FILE):
+    """Writes the normalized, quantized average strategy of a CFR strategy directory to a policy file."""
+    if np is None:
+        raise ImportError("NumPy is required to export a policy.")
+    strategy = CFRTrainer.CFRStrategy(strategy_directory)
+    tree, config = strategy.tree, strategy.config
+    decisions = [node for node in range(len(tree.kind)) if tree.kind[node] == CFRTrainer.DECISION] # Rows are in node order
+    legal = np.zeros((len(decisions), CFRTrainer.NUM_ACTIONS), dtype=bool)
+    for i, node in enumerate(decisions):
+        legal[i, tree.actions[node]] = True
+    legal = np.repeat(legal, [tree.buckets_per_street[tree.street[node]] for node in decisions], axis=0)
+
+    sums = np.where(legal, np.asarray(strategy.strategy_sum, dtype=np.float64), 0.0)
+    totals = sums.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        probabilities = np.where(totals > 0, sums / totals, legal / legal.sum(axis=1, keepdims=True)) # Unvisited rows play uniformly
+    # Quantize so each row adds up to exactly 255: round down, then hand the rest to the largest remainders
+    scaled = probabilities * _PROBABILITY_SCALE
+    quantized = np.floor(scaled).astype(np.int64)
+    remainders = np.where(legal, scaled - quantized, -1.0)
+    short = _PROBABILITY_SCALE - quantized.sum(axis=1, keepdims=True)
+    ranks = np.argsort(np.argsort(-remainders, axis=1, kind='stable'), axis=1)
+    quantized += ranks < short
+
+    abstraction = config['abstraction'].encode('ascii')
+    with open(path, "wb") as f:
+        f.write(_POLICY_HEADER.pack(_POLICY_MAGIC, POLICY_FILE_VERSION, tree.num_infosets, config['max_raises'],
+                                    config['postflop_buckets'], len(config['stack_classes']), abstraction))
+        for stack in config['stack_classes']:
+            f.write(_STACK_CLASS.pack(stack))
+        f.write(quantized.astype(np.uint8).tobytes())
+
+
+class PolicyTable:
+    """A memory-mapped policy file with the betting tree and card abstraction it was exported with."""
+
+    def __init__(self, path=POLICY_FILE):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _POLICY_HEADER.size:
+            raise ValueError(f"{path} is truncated - export it again with PolicyTable.py")
+        magic, version, num_infosets, max_raises, postflop_buckets, num_stacks, abstraction = _POLICY_HEADER.unpack_from(self._map)
+        if magic != _POLICY_MAGIC or version != POLICY_FILE_VERSION:
+            raise ValueError(f"{path} is not a version {POLICY_FILE_VERSION} policy file - export it again with PolicyTable.py")
+        stacks = [_STACK_CLASS.unpack_from(self._map, _POLICY_HEADER.size + i * _STACK_CLASS.size)[0] for i in range(num_stacks)]
+        self.config = {'stack_classes': stacks, 'max_raises': max_raises, 'postflop_buckets': postflop_buckets,
+                       'abstraction': abstraction.rstrip(b'\0').decode('ascii')}
+        self.tree = CFRTrainer._make_tree(self.config)
+        self.abstraction = CFRTrainer._make_abstraction(self.config)
+        self._start = _POLICY_HEADER.size + num_stacks * _STACK_CLASS.size
+        if self.tree.num_infosets != num_infosets or len(self._map) != self._start + num_infosets * CFRTrainer.NUM_ACTIONS:
+            raise ValueError(f"{path} doesn't match its betting tree - export it again with PolicyTable.py")
+
+    def probabilities(self, node, bucket):
+        """{action: probability} at a decision node for a card bucket."""
+        row = self._start + (self.tree.offset[node] + bucket) * CFRTrainer.NUM_ACTIONS
+        weights = self._map[row:row + CFRTrainer.NUM_ACTIONS]
+        return {action: weights[action] / _PROBABILITY_SCALE for action in self.tree.actions[node]}
+
+    def sample(self, node, bucket, rng=random):
+        """An action drawn from the policy at a decision node for a card bucket."""
+        row = self._start + (self.tree.offset[node] + bucket) * CFRTrainer.NUM_ACTIONS
+        weights = self._map[row:row + CFRTrainer.NUM_ACTIONS]
+        pick = rng.randrange(_PROBABILITY_SCALE)
+        for action in self.tree.actions[node]:
+            pick -= weights[action]
+            if pick < 0:
+                return action
+        return self.tree.actions[node][-1]
+
+
+def get_policy(path=POLICY_FILE):
+    """PolicyTable for path, loaded once per process; None if there is no usable policy file."""
+    if path not in _POLICIES:
+        try:
+            _POLICIES[path] = PolicyTable(path)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG Policy: No policy table available at {path} ({e})")
+            _POLICIES[path] = None
+    return _POLICIES[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained CFR strategy as a policy table.")
+    parser.add_argument('--strategy', default=CFRTrainer.CFR_DIR, help="CFR strategy directory")
+    parser.add_argument('--output', default=POLICY_FILE)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    export_policy(args.strategy, args.output)
+    print(f"Wrote {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
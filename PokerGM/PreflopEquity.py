@@ -0,0 +1,209 @@
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from CardEncoding import RANK_CHARS, card_from_str
+from Deck import Deck
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed to build the data file, not to read it
+    np = None
+
+# Preflop equity between the 169 starting-hand classes (AA, AKs, AKo, ..., 32o), precomputed
+# once and shipped as a small binary file, so a preflop decision is a table lookup.
+#  - Heads-up: 169 x 169 matrix, equity of class i against class j (averaged over every
+#    non-overlapping pair of combos and every board).
+#  - Multiway: 169 x MAX_OPPONENTS table, equity of class i against 1..9 random hands.
+# Equities are stored as uint16 (equity * 65535), little-endian.
+# Rebuild (NumPy needed, takes a while): python PreflopEquity.py [--matchup-samples N] [--multiway-samples N]
+
+NUM_CLASSES = 169
+MAX_OPPONENTS = 9
+PREFLOP_FILE_VERSION = 1
+PREFLOP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"preflop_equity_v{PREFLOP_FILE_VERSION}.bin")
+_PREFLOP_MAGIC = b"PGPF"
+_PREFLOP_HEADER = struct.Struct("<4sIIII") # magic, version, classes, max opponents, samples per heads-up cell
+_EQUITY_SCALE = 65535
+
+_HEADS_UP = None # Flat list, heads-up equity of class i vs j at i * NUM_CLASSES + j
+_MULTIWAY = None # Flat list, equity of class i vs n random hands at i * MAX_OPPONENTS + n - 1
+
+
+# --- Hand classes ---
+# Class index = row * 13 + col on the usual 13x13 grid with aces first: pairs on the diagonal,
+# suited hands above it (row = high rank), offsuit hands below it (row = low rank).
+
+def hand_class(hole_cards):
+    """Class index 0..168 of two hole cards (card ints from CardEncoding, or 'Ah'-style strings)."""
+    first, second = [card_from_str(c) if isinstance(c, str) else c for c in hole_cards]
+    high, low = 12 - max(first >> 2, second >> 2), 12 - min(first >> 2, second >> 2) # 0 = ace
+    if first & 3 == second & 3:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index):
+    """'AA', 'AKs', 'AKo', ... for a class index."""
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANK_CHARS[12 - row] * 2
+    if row < col:
+        return RANK_CHARS[12 - row] + RANK_CHARS[12 - col] + 's'
+    return RANK_CHARS[12 - col] + RANK_CHARS[12 - row] + 'o'
+
+
+def class_index(name):
+    """Class index for 'AA', 'AKs' or 'AKo' (case of the suffix doesn't matter). Raises ValueError."""
+    name = name.strip()
+    if len(name) not in (2, 3) or name[0] not in RANK_CHARS or name[1] not in RANK_CHARS:
+        raise ValueError(f"Invalid hand class: {name!r}")
+    high, low = 12 - RANK_CHARS.index(name[0]), 12 - RANK_CHARS.index(name[1])
+    suffix = name[2:].lower()
+    if high == low:
+        if suffix: raise ValueError(f"Invalid hand class: {name!r}")
+        return high * 13 + high
+    if high > low:
+        high, low = low, high
+    if suffix == 's':
+        return high * 13 + low
+    if suffix == 'o':
+        return low * 13 + high
+    raise ValueError(f"Hand class needs an 's' or 'o' suffix: {name!r}")
+
+
+def class_combos(index):
+    """Every 2-card combo (card int pairs) in a class: 6 for pairs, 4 suited, 12 offsuit."""
+    row, col = divmod(index, 13)
+    rank_a, rank_b = 12 - row, 12 - col
+    if row == col:
+        return [(rank_a * 4 + s1, rank_a * 4 + s2) for s1, s2 in combinations(range(4), 2)]
+    if row < col:
+        return [(rank_a * 4 + s, rank_b * 4 + s) for s in range(4)]
+    return [(rank_b * 4 + s1, rank_a * 4 + s2) for s1 in range(4) for s2 in range(4) if s1 != s2]
+
+
+# --- Lookups ---
+
+def _load_tables(path=PREFLOP_FILE):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, num_classes, max_opponents, _samples = _PREFLOP_HEADER.unpack_from(data)
+    if magic != _PREFLOP_MAGIC or version != PREFLOP_FILE_VERSION or num_classes != NUM_CLASSES or max_opponents != MAX_OPPONENTS:
+        raise ValueError(f"{path} is not a version {PREFLOP_FILE_VERSION} preflop equity file - rebuild it with PreflopEquity.py")
+    values = array('H')
+    values.frombytes(data[_PREFLOP_HEADER.size:])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    heads_up_size = NUM_CLASSES * NUM_CLASSES
+    if len(values) != heads_up_size + NUM_CLASSES * MAX_OPPONENTS:
+        raise ValueError(f"{path} is truncated - rebuild it with PreflopEquity.py")
+    scale = 1 / _EQUITY_SCALE
+    return [v * scale for v in values[:heads_up_size]], [v * scale for v in values[heads_up_size:]]
+
+
+def _get_tables():
+    global _HEADS_UP, _MULTIWAY
+    if _HEADS_UP is None:
+        _HEADS_UP, _MULTIWAY = _load_tables()
+    return _HEADS_UP, _MULTIWAY
+
+
+def class_vs_class(index_a, index_b):
+    """Heads-up all-in equity of hand class index_a against class index_b."""
+    heads_up, _ = _get_tables()
+    return heads_up[index_a * NUM_CLASSES + index_b]
+
+
+def preflop_matchup(hole_a, hole_b):
+    """Heads-up preflop equity of hole_a against hole_b, by their hand classes (suit overlap is averaged out)."""
+    return class_vs_class(hand_class(hole_a), hand_class(hole_b))
+
+
+def preflop_equity(hole_cards, num_opponents=1):
+    """Preflop equity of hole_cards against num_opponents (1..9) random hands."""
+    if not 1 <= num_opponents <= MAX_OPPONENTS:
+        raise ValueError(f"num_opponents must be 1..{MAX_OPPONENTS}, got {num_opponents}")
+    _, multiway = _get_tables()
+    return multiway[hand_class(hole_cards) * MAX_OPPONENTS + num_opponents - 1]
+
+
+# --- Building the file (offline, NumPy) ---
+
+def _build_heads_up(samples, rng, evaluate_batch, cells_per_step=8):
+    from Equity import _showdown_shares
+    matrix = np.zeros((NUM_CLASSES, NUM_CLASSES))
+    combos = [class_combos(i) for i in range(NUM_CLASSES)]
+    cells = [(i, j) for i in range(NUM_CLASSES) for j in range(i, NUM_CLASSES)]
+    start = time.perf_counter()
+    for step in range(0, len(cells), cells_per_step):
+        step_cells = cells[step:step + cells_per_step]
+        hands = []
+        for i, j in step_cells:
+            # Every non-overlapping pair of combos is equally likely
+            pairs = np.array([a + b for a in combos[i] for b in combos[j] if not set(a) & set(b)], dtype=np.int64)
+            hands.append(pairs[rng.integers(len(pairs), size=samples)])
+        hands = np.concatenate(hands)
+        dead = np.bitwise_or.reduce(np.left_shift(np.uint64(1), hands.astype(np.uint64)), axis=1)
+        boards = Deck.deal_batch(len(hands), 5, dead, rng)
+        scores_a = evaluate_batch(np.concatenate([hands[:, :2], boards], axis=1))
+        scores_b = evaluate_batch(np.concatenate([hands[:, 2:], boards], axis=1))
+        shares = _showdown_shares(scores_a, scores_b[:, None]).reshape(len(step_cells), samples).mean(axis=1)
+        for (i, j), share in zip(step_cells, shares):
+            matrix[i, j] = share if i != j else 0.5 # A class against itself is a coin flip by symmetry
+            matrix[j, i] = 1.0 - matrix[i, j] # Ties split evenly, so the two sides always add up to 1
+        if step % (cells_per_step * 200) == 0:
+            print(f"  heads-up: {step + len(step_cells):,}/{len(cells):,} cells, {time.perf_counter() - start:.0f}s")
+    return matrix
+
+
+def _build_multiway(samples, rng, evaluate_batch):
+    from Equity import _showdown_shares
+    table = np.zeros((NUM_CLASSES, MAX_OPPONENTS))
+    for i in range(NUM_CLASSES):
+        combos = np.array(class_combos(i), dtype=np.int64)
+        hero = combos[rng.integers(len(combos), size=samples)]
+        dead = np.bitwise_or.reduce(np.left_shift(np.uint64(1), hero.astype(np.uint64)), axis=1)
+        for num_opponents in range(1, MAX_OPPONENTS + 1):
+            dealt = Deck.deal_batch(samples, 5 + 2 * num_opponents, dead, rng)
+            board = dealt[:, :5]
+            hero_scores = evaluate_batch(np.concatenate([hero, board], axis=1))
+            opponent_scores = np.stack([evaluate_batch(np.concatenate([dealt[:, 5 + 2 * k:7 + 2 * k], board], axis=1))
+                                        for k in range(num_opponents)], axis=1)
+            table[i, num_opponents - 1] = _showdown_shares(hero_scores, opponent_scores).mean()
+        if i % 20 == 0:
+            print(f"  multiway: {class_name(i)} done")
+    return table
+
+
+def build_preflop_file(path=PREFLOP_FILE, matchup_samples=10000, multiway_samples=40000, seed=12345):
+    """Simulates both tables (NumPy batch evaluation) and writes them to path."""
+    if np is None:
+        raise ImportError("NumPy is required to build the preflop equity file.")
+    from HandEvaluator import HandEvaluator
+    evaluate_batch = HandEvaluator(verbose=False, backend='numpy').evaluate_batch
+    rng = np.random.default_rng(seed)
+    heads_up = _build_heads_up(matchup_samples, rng, evaluate_batch)
+    multiway = _build_multiway(multiway_samples, rng, evaluate_batch)
+    values = np.concatenate([heads_up.ravel(), multiway.ravel()])
+    with open(path, "wb") as f:
+        f.write(_PREFLOP_HEADER.pack(_PREFLOP_MAGIC, PREFLOP_FILE_VERSION, NUM_CLASSES, MAX_OPPONENTS, matchup_samples))
+        f.write(np.rint(values * _EQUITY_SCALE).astype('<u2').tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the preflop equity file.")
+    parser.add_argument('--matchup-samples', type=int, default=10000, help="Boards per heads-up class matchup")
+    parser.add_argument('--multiway-samples', type=int, default=40000, help="Deals per class and opponent count")
+    parser.add_argument('--seed', type=int, default=12345)
+    parser.add_argument('--output', default=PREFLOP_FILE)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    build_preflop_file(args.output, args.matchup_samples, args.multiway_samples, args.seed)
+    print(f"Wrote {args.output} in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import pygame
 import os # Needed for path joining
 import traceback # For printing detailed errors
+from OutsAnalyzer import analyze_outs # Real numbers for the outs page
 
 # *** Import the REAL Card class from blackjack.py ***
 try:
@@ -324,6 +325,33 @@ class TexasHoldemTutorial:
                 {"card": "back", "x": 0.85, "y": 0.75, "label": "River"}
             ]
         }
+        # Outs page: the example's numbers come straight from the outs analyzer
+        outs_example = analyze_outs(["Ah", "Kh"], ["9h", "2h", "Jc"])
+        outs_lines = [f"- {name}: {draw['outs']} outs ({draw['next_card']:.0%} on the turn)"
+                      for name, draw in outs_example['draws'].items() if draw['outs']]
+        outs_lines.append(f"- Improves by the river: {outs_example['by_river']:.0%}")
+        page_outs = {
+            "title": "OUTS AND DRAWS",
+            "text": [
+                "Outs: unseen cards that improve",
+                "your hand to a likely winner.",
+                "",
+                "Ah Kh on a 9h 2h Jc flop:",
+            ] + outs_lines + [
+                "",
+                "Rule of 4 and 2: outs x 4 on the flop",
+                "(outs x 2 on the turn) ~ % to hit.",
+                "",
+                "Click or Press Key to Continue..."
+            ],
+            "visuals": [
+                {"card": "Ah", "x": 0.65, "y": 0.3, "label": "Hole Card"},
+                {"card": "Kh", "x": 0.80, "y": 0.3, "label": "Hole Card"},
+                {"card": "9h", "x": 0.55, "y": 0.75, "label": "Flop"},
+                {"card": "2h", "x": 0.70, "y": 0.75, "label": "Flop"},
+                {"card": "Jc", "x": 0.85, "y": 0.75, "label": "Flop"}
+            ]
+        }
         page_strategy = {
             "title": "GAME STRATEGY (Very Basic)",
             "text": [
@@ -357,6 +385,7 @@ class TexasHoldemTutorial:
             page_rankings_intro
         ] + hand_pages + [ # Inserts the detailed hand pages list
             page_betting,
+            page_outs,
             page_strategy
         ]
 
@@ -0,0 +1,110 @@
+import random
+import sys
+import time
+from Deck import Deck
+from HandEvaluator import HandEvaluator
+try:
+    import numpy as np
+except ImportError: # Batch numbers are skipped without NumPy
+    np = None
+
+# Compares the lookup-table evaluator against the original combinatorial one.
+# Usage: python benchmark_evaluator.py [num_hands]
+
+CACHE_SIZE = 4096
+
+
+def random_hands(num_hands, num_cards=7, seed=12345):
+    """Deals num_hands random hands of num_cards cards each, split into (hole, community)."""
+    random.seed(seed)
+    deck = Deck()
+    hands = []
+    for _ in range(num_hands):
+        deck.reset_and_shuffle()
+        cards = [deck.deal_card() for _ in range(num_cards)]
+        hands.append((cards[:2], cards[2:]))
+    return hands
+
+
+def relabeled_repeats(hands, repeats, seed=12345):
+    """Each hand repeats times, every copy with its suits shuffled - a spot queried again, as bots and the HUD do."""
+    rng = random.Random(seed)
+    spots = []
+    for hole, community in hands:
+        for _ in range(repeats):
+            suits = list(range(4))
+            rng.shuffle(suits)
+            relabel = lambda cards: [card - (card & 3) + suits[card & 3] for card in cards]
+            spots.append((relabel(hole), relabel(community)))
+    return spots
+
+
+def _same_result(result, expected, cards):
+    """Same HandRank and an equally good best five drawn from cards (equal-rank cards may be swapped)."""
+    (rank, best), (expected_rank, expected_best) = result, expected
+    return rank == expected_rank and set(best) <= set(cards) and sorted(c >> 2 for c in best) == sorted(c >> 2 for c in expected_best)
+
+
+def time_evaluator(evaluate, hands):
+    """Returns hands per second for evaluate(hole, community) over all hands."""
+    start = time.perf_counter()
+    for hole, community in hands:
+        evaluate(hole, community)
+    elapsed = time.perf_counter() - start
+    return len(hands) / elapsed if elapsed > 0 else float('inf')
+
+
+def main():
+    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    evaluator = HandEvaluator(verbose=False)
+
+    # Build the tables up front so their one-off cost isn't counted as evaluation time
+    build_start = time.perf_counter()
+    evaluator.evaluate_hand([], [])
+    evaluator.evaluate_hand(['2h', '3d'], ['4c', '5s', '7h'])
+    print(f"Table build: {time.perf_counter() - build_start:.2f}s")
+
+    for num_cards in (5, 6, 7):
+        hands = random_hands(num_hands, num_cards)
+
+        # Both evaluators must agree on every hand before speed means anything
+        mismatches = 0
+        for hole, community in hands:
+            table_rank, _ = evaluator.evaluate_hand(hole, community)
+            combo_rank, _ = evaluator.evaluate_hand_combinatorial(hole, community)
+            if not table_rank == combo_rank:
+                mismatches += 1
+        combo_hands = hands[:max(1, num_hands // 10)] # The old evaluator is slow, a sample is enough
+        combo_rate = time_evaluator(evaluator.evaluate_hand_combinatorial, combo_hands)
+        table_rate = time_evaluator(evaluator.evaluate_hand, hands)
+
+        print(f"{num_cards}-card hands: combinatorial {combo_rate:,.0f} hands/s, "
+              f"table {table_rate:,.0f} hands/s, speedup x{table_rate / combo_rate:.1f}, "
+              f"mismatches {mismatches}/{len(hands)}")
+
+        if np is not None:
+            card_array = np.array([hole + community for hole, community in hands])
+            evaluator.evaluate_batch(card_array[:1]) # NumPy tables are built on first use
+            start = time.perf_counter()
+            batch_scores = evaluator.evaluate_batch(card_array)
+            batch_rate = len(hands) / (time.perf_counter() - start)
+            batch_mismatches = sum(1 for (hole, community), score in zip(hands, batch_scores.tolist())
+                                   if evaluator.hand_strength(hole, community) != score)
+            print(f"{num_cards}-card hands: batch {batch_rate:,.0f} hands/s, speedup x{batch_rate / combo_rate:.1f}, "
+                  f"mismatches {batch_mismatches}/{len(hands)}")
+
+    # evaluate_hand cache: hit rate and speedup on random hands (worst case) and on repeated spots
+    for label, spots in (("random hands", random_hands(num_hands)), ("repeated spots", relabeled_repeats(random_hands(num_hands // 4), 4))):
+        cached = HandEvaluator(verbose=False, cache_size=CACHE_SIZE)
+        uncached_rate = time_evaluator(evaluator.evaluate_hand, spots)
+        cached_rate = time_evaluator(cached.evaluate_hand, spots)
+        info = cached.cache_info()
+        mismatches = sum(1 for hole, community in spots
+                         if not _same_result(cached.evaluate_hand(hole, community), evaluator.evaluate_hand(hole, community), hole + community))
+        print(f"Cache ({CACHE_SIZE} entries), {label}: hit rate {info.hits / (info.hits + info.misses):.0%}, "
+              f"{cached_rate:,.0f} vs {uncached_rate:,.0f} hands/s uncached, speedup x{cached_rate / uncached_rate:.2f}, "
+              f"mismatches {mismatches}/{len(spots)}")
+
+
+if __name__ == "__main__":
+    main()
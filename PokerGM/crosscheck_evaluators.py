@@ -0,0 +1,138 @@
+import argparse
+import random
+import time
+from itertools import combinations, islice
+from HandEvaluator import HandEvaluator, HandRank, EVALUATOR_BACKENDS
+try:
+    import numpy as np
+except ImportError: # The 'numpy' backend is skipped without NumPy
+    np = None
+
+# Cross-checks the evaluator backends against each other and reports their throughput.
+#  - Every 5-card hand (2,598,960) is scored by each backend; the category counts must match
+#    the known totals and all backends must agree hand by hand.
+#  - Random 7-card hands are compared the same way.
+#  - Random Omaha hands (4 hole cards, 5 board cards, 2+3 rule) are compared the same way.
+# Usage: python crosscheck_evaluators.py [--stride N] [--samples N]
+# --stride N only checks every Nth 5-card hand for the combinatorial backend (it is slow).
+
+# Number of 5-card hands in each category, out of C(52, 5)
+FIVE_CARD_CATEGORY_COUNTS = {
+    HandRank.ROYAL_FLUSH: 4, HandRank.STRAIGHT_FLUSH: 36, HandRank.FOUR_OF_A_KIND: 624,
+    HandRank.FULL_HOUSE: 3744, HandRank.FLUSH: 5108, HandRank.STRAIGHT: 10200,
+    HandRank.THREE_OF_A_KIND: 54912, HandRank.TWO_PAIR: 123552, HandRank.PAIR: 1098240,
+    HandRank.HIGH_CARD: 1302540,
+}
+CHUNK_SIZE = 100000
+
+
+def available_backends():
+    names = [name for name in EVALUATOR_BACKENDS if name != 'numpy' or np is not None]
+    return {name: HandEvaluator(verbose=False, backend=name) for name in names}
+
+
+def score_rows(evaluator, rows):
+    """Scores a list of card lists with a backend's batch path, as a plain list."""
+    batch = np.array(rows, dtype=np.int64) if np is not None else rows
+    scores = evaluator.evaluate_batch(batch)
+    return scores.tolist() if hasattr(scores, 'tolist') else list(scores)
+
+
+def check_five_card_hands(evaluators, stride):
+    print("--- Exhaustive 5-card hands ---")
+    reference_name = 'table'
+    category_counts = {}
+    mismatches = {name: 0 for name in evaluators}
+    elapsed = {name: 0.0 for name in evaluators}
+    checked = {name: 0 for name in evaluators}
+
+    all_hands = combinations(range(52), 5)
+    while True:
+        rows = [list(hand) for hand in islice(all_hands, CHUNK_SIZE)]
+        if not rows: break
+        start = time.perf_counter()
+        reference = score_rows(evaluators[reference_name], rows)
+        elapsed[reference_name] += time.perf_counter() - start
+        checked[reference_name] += len(rows)
+        for score in reference:
+            category_counts[score >> 20] = category_counts.get(score >> 20, 0) + 1
+
+        for name, evaluator in evaluators.items():
+            if name == reference_name: continue
+            sample = rows[::stride] if name == 'combinatorial' else rows
+            expected = reference[::stride] if name == 'combinatorial' else reference
+            start = time.perf_counter()
+            scores = score_rows(evaluator, sample)
+            elapsed[name] += time.perf_counter() - start
+            checked[name] += len(sample)
+            mismatches[name] += sum(1 for a, b in zip(scores, expected) if a != b)
+
+    for rank_type, expected_count in sorted(FIVE_CARD_CATEGORY_COUNTS.items()):
+        found = category_counts.get(rank_type, 0)
+        status = "ok" if found == expected_count else "MISMATCH"
+        print(f"  {HandRank.RANK_NAMES[rank_type]:<16} {found:>9,} (expected {expected_count:,}) {status}")
+    for name in evaluators:
+        rate = checked[name] / elapsed[name] if elapsed[name] else float('inf')
+        print(f"  {name:<14} checked {checked[name]:>9,} hands, mismatches vs {reference_name}: {mismatches[name]}, {rate:,.0f} hands/s")
+    counts_ok = all(category_counts.get(r, 0) == n for r, n in FIVE_CARD_CATEGORY_COUNTS.items())
+    return counts_ok and not any(mismatches.values())
+
+
+def check_seven_card_samples(evaluators, num_samples, seed):
+    print(f"--- {num_samples:,} random 7-card hands ---")
+    rng = random.Random(seed)
+    rows = [rng.sample(range(52), 7) for _ in range(num_samples)]
+    results = {}
+    for name, evaluator in evaluators.items():
+        start = time.perf_counter()
+        results[name] = score_rows(evaluator, rows)
+        rate = num_samples / (time.perf_counter() - start)
+        print(f"  {name:<14} {rate:>12,.0f} hands/s")
+    reference = results['table']
+    all_agree = True
+    for name, scores in results.items():
+        mismatches = sum(1 for a, b in zip(scores, reference) if a != b)
+        all_agree = all_agree and mismatches == 0
+        print(f"  {name:<14} mismatches vs table: {mismatches}")
+    return all_agree
+
+
+def check_omaha_samples(evaluators, num_samples, seed):
+    print(f"--- {num_samples:,} random Omaha hands ---")
+    rng = random.Random(seed)
+    deals = [rng.sample(range(52), 9) for _ in range(num_samples)]
+    results = {}
+    for name, evaluator in evaluators.items():
+        sample = deals[:max(1, num_samples // 50)] if name == 'combinatorial' else deals # 60 combos each, sample it
+        start = time.perf_counter()
+        results[name] = [evaluator.omaha_strength(cards[:4], cards[4:]) for cards in sample]
+        rate = len(sample) / (time.perf_counter() - start)
+        print(f"  {name:<14} {rate:>12,.0f} hands/s")
+    reference = results['table']
+    all_agree = True
+    for name, scores in results.items():
+        mismatches = sum(1 for a, b in zip(scores, reference) if a != b)
+        all_agree = all_agree and mismatches == 0
+        print(f"  {name:<14} mismatches vs table: {mismatches}")
+    return all_agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-check the hand evaluator backends.")
+    parser.add_argument('--stride', type=int, default=1, help="Check every Nth 5-card hand with the combinatorial backend")
+    parser.add_argument('--samples', type=int, default=50000, help="Number of random 7-card hands")
+    parser.add_argument('--seed', type=int, default=12345)
+    args = parser.parse_args()
+
+    evaluators = available_backends()
+    print(f"Backends: {', '.join(evaluators)}")
+    five_ok = check_five_card_hands(evaluators, max(1, args.stride))
+    seven_ok = check_seven_card_samples(evaluators, args.samples, args.seed)
+    omaha_ok = check_omaha_samples(evaluators, args.samples // 5, args.seed)
+    all_ok = five_ok and seven_ok and omaha_ok
+    print("All backends agree." if all_ok else "BACKENDS DISAGREE - do not switch engines.")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())